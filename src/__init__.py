@@ -8,10 +8,27 @@
 - 依赖注入：服务层解耦
 """
 
+import importlib
+
 # 导入主要组件供外部使用
 from .config import AppConfig
 from .core import WorkflowFactory, WorkflowContext, WorkflowResult
-from .services import EnvironmentService, AgentService
+
+# 服务类在首次访问时才导入（AgentService 会连带导入 Agent 工厂和 aider），
+# 导入后写回模块全局，之后的访问不再经过 __getattr__
+_LAZY_IMPORTS = {
+    'EnvironmentService': '.services',
+    'AgentService': '.services',
+}
 
 __version__ = "2.0.0"
 __author__ = "AI Assistant"
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
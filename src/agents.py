@@ -1,9 +1,13 @@
 # agents.py
 import os
 from pathlib import Path
-from aider.coders import Coder, ArchitectCoder, AskCoder
-from aider.models import Model
-from aider.io import InputOutput
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aider.coders import Coder
+
+# aider 会连带导入 litellm 等大量模块，延迟到真正创建 Agent 时再导入，
+# 这样仅使用配置、条件评估等轻量功能时不必承担这部分启动开销
 
 class AiderAgentFactory:
     def __init__(self, model_name="openai/glm-4.6", api_base=None):
@@ -16,6 +20,7 @@ class AiderAgentFactory:
 
         # 创建Model实例
         # 注意：如果需要支持不同的api_base，可能需要在这里或create_coder中动态配置Model
+        from aider.models import Model
         self.model = Model(model_name)
 
         # 修改Aider的默认request_timeout从600秒增加到1800秒（30分钟）
@@ -23,11 +28,11 @@ class AiderAgentFactory:
         import aider.models
         aider.models.request_timeout = 1800
 
-    # Agent类型映射表，用于选择不同的Coder实现
+    # Agent类型映射表，用于选择不同的Coder实现（值为 aider.coders 中的类名）
     CODER_TYPES = {
-        "coder": Coder,
-        "architect": ArchitectCoder,
-        "ask": AskCoder,
+        "coder": "Coder",
+        "architect": "ArchitectCoder",
+        "ask": "AskCoder",
     }
 
     def create_coder(
@@ -37,7 +42,7 @@ class AiderAgentFactory:
         agent_name: str,
         type: str = "coder",
         **kwargs
-    ) -> Coder:
+    ) -> "Coder":
         """
         创建 Coder，并配置日志记录
         所有agents共享同一个文件，通过绝对路径访问
@@ -49,6 +54,9 @@ class AiderAgentFactory:
             type: Agent类型，可选值: "coder", "architect", "ask"
             **kwargs: 其他参数
         """
+        from aider import coders
+        from aider.io import InputOutput
+
         # 1. 显式定义聊天记录文件路径
         # 这样你就能在 agent_a/.aider.chat.history.md 中看到记录了
         history_file = root_path / f".aider.chat.history.md"
@@ -64,7 +72,7 @@ class AiderAgentFactory:
         )
 
         # 3. 根据type获取对应的 Coder 类
-        CoderClass = self.CODER_TYPES.get(type, Coder)
+        CoderClass = getattr(coders, self.CODER_TYPES.get(type, "Coder"))
 
         # 4. 创建 Coder - 使用绝对路径，确保所有操作都在workspace下
         # 修复：临时切换 CWD 到 agent 目录，确保 Aider 识别正确的 Git 根目录
@@ -2,13 +2,59 @@
 应用配置管理
 """
 
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Any
-from omegaconf import OmegaConf, DictConfig
+from omegaconf import OmegaConf, DictConfig, ListConfig
 from ..diagnostics.exceptions import ConfigurationError
 from ..decorators.error_handlers import config_load_error_handler
 from dotenv import load_dotenv
 
+# .env 只需解析一次，后续 load() 直接跳过
+_dotenv_loaded = False
+
+
+@lru_cache(maxsize=4)
+def _load_config_file(config_path: str, mtime_ns: int) -> DictConfig:
+    """按 (路径, 修改时间) 缓存YAML解析结果，文件被修改后自动失效"""
+    return OmegaConf.load(config_path)
+
+
+def _snapshot_value(value: Any) -> Any:
+    """将OmegaConf节点转换为可直接访问的快照值"""
+    if isinstance(value, DictConfig):
+        return ConfigSection(value)
+    if isinstance(value, ListConfig):
+        return OmegaConf.to_container(value, resolve=True)
+    return value
+
+
+class ConfigSection:
+    """只读配置节
+
+    首次访问某个字段时通过OmegaConf解析（包括插值），随后将结果写入实例
+    __dict__，之后的访问就是普通的属性读取，不再经过OmegaConf。
+    """
+
+    def __init__(self, node: DictConfig):
+        self.__dict__["_node"] = node
+
+    def __getattr__(self, name: str) -> Any:
+        # 私有/特殊属性不转发，避免copy/pickle探测时递归
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            value = getattr(self._node, name)
+        except AttributeError:
+            raise AttributeError(f"Configuration missing required item: '{name}'")
+        value = _snapshot_value(value)
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Configuration is read-only: '{name}'")
+
+
 class AppConfig:
     """配置代理 - 完全配置驱动
 
@@ -41,6 +87,8 @@ class AppConfig:
         config.paths.project_root
         config.aider.model
 
+        首次访问时解析并缓存为实例属性，之后的访问不再进入此方法。
+
         Args:
             name: 属性名
 
@@ -50,10 +98,15 @@ class AppConfig:
         Raises:
             AttributeError: 当配置项不存在时
         """
+        if name.startswith("_"):
+            raise AttributeError(name)
         try:
-            return getattr(self._config, name)
+            value = getattr(self._config, name)
         except AttributeError:
             raise AttributeError(f"Configuration missing required item: '{name}'")
+        value = _snapshot_value(value)
+        self.__dict__[name] = value
+        return value
 
     @property
     def config(self) -> DictConfig:
@@ -76,22 +129,28 @@ class AppConfig:
         config_path = cls._get_config_path()
 
         # 2. 验证文件存在（装饰器会处理异常）
-        if not config_path.exists():
+        try:
+            mtime_ns = config_path.stat().st_mtime_ns
+        except FileNotFoundError:
             raise ConfigurationError(f"Config file not found: {config_path}")
 
         # 3. 使用OmegaConf一键加载并自动解析所有变量（包括环境变量）
         # load_dotenv() 已加载.env文件，${oc.env:VAR_NAME} 会自动解析
-        conf: DictConfig = OmegaConf.load(str(config_path))
+        # 同一文件未修改时复用已解析的结果，避免重复解析YAML
+        conf: DictConfig = _load_config_file(str(config_path), mtime_ns)
 
         # 4. 创建配置代理实例
         return cls(conf)
 
     @classmethod
     def _ensure_dotenv_loaded(cls) -> None:
-        """确保 .env 文件被加载"""
+        """确保 .env 文件被加载（进程内只加载一次）"""
+        global _dotenv_loaded
+        if _dotenv_loaded:
+            return
         env_path = Path(__file__).parent.parent / ".env"
         load_dotenv(dotenv_path=env_path)
-       
+        _dotenv_loaded = True
 
     @classmethod
     def _get_config_path(cls) -> Path:
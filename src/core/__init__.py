@@ -6,7 +6,7 @@ from .workflow_base import BaseWorkflow, WorkflowContext, WorkflowResult
 from .workflow_factory import WorkflowFactory
 from .router_base import BaseRouter
 from .workflow_state import WorkflowState
-from ..diagnostics.logging import WorkflowLogger, get_logger, log_info, log_error, log_warning, log_debug
+from ..diagnostics.logging import WorkflowLogger, get_logger, _LOG_NAMES
 from ..diagnostics.exceptions import (
     WorkflowException,
     ConfigurationError,
@@ -54,3 +54,13 @@ __all__ = [
     'filesystem_error',
     'timeout_error'
 ]
+
+
+def __getattr__(name: str):
+    # log_* 在首次访问时才从 diagnostics.logging 获取，导入本包时不创建日志器单例
+    if name not in _LOG_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from ..diagnostics import logging as _logging
+    value = getattr(_logging, name)
+    globals()[name] = value
+    return value
@@ -1,18 +1,68 @@
 """
 配置驱动的工作流 - 基于YAML配置的工作流实现
 """
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import yaml
 
+# 优先使用libyaml C扩展加载器，未编译时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 from ..core.workflow_base import BaseWorkflow, WorkflowContext, WorkflowResult
-from ..engines.langgraph_engine import LangGraphEngine
 from ..services.evaluators.condition_evaluator import UnifiedConditionEvaluator
 from ..diagnostics.logging import get_logger
 import importlib
 
 
+@lru_cache(maxsize=1)
+def _workflow_config_index() -> Dict[str, Path]:
+    """
+    一次性扫描所有工作流配置文件，构建 {workflow_name: path} 索引
+
+    优先级（高到低）：
+    - workflows/{name}/workflow.yaml|yml（workflow package）
+    - config/{name}.yaml|yml（兼容旧格式）
+    - workflows/{name}.yaml|yml（兼容旧格式）
+
+    find_workflow_config 未命中时会清空缓存重新扫描，运行期间新增的配置文件也能找到。
+    """
+    # 从项目根目录查找 (src目录)
+    project_root = Path(__file__).parent.parent
+    workflows_dir = project_root / "workflows"
+    config_dir = project_root / "config"
+
+    index: Dict[str, Path] = {}
+    for suffix in ("yaml", "yml"):
+        for path in sorted(workflows_dir.glob(f"*/workflow.{suffix}")):
+            index.setdefault(path.parent.name, path)
+    for directory in (config_dir, workflows_dir):
+        for suffix in ("yaml", "yml"):
+            for path in sorted(directory.glob(f"*.{suffix}")):
+                index.setdefault(path.stem, path)
+    return index
+
+
+def find_workflow_config(workflow_name: str) -> Optional[Path]:
+    """查找工作流配置文件路径，未找到时返回None"""
+    path = _workflow_config_index().get(workflow_name)
+    if path is None:
+        # 索引可能是在新增配置文件之前建立的，重新扫描一次再判断
+        _workflow_config_index.cache_clear()
+        path = _workflow_config_index().get(workflow_name)
+    return path
+
+
+def list_workflow_configs() -> Dict[str, Path]:
+    """列出所有配置驱动的工作流 {workflow_name: 配置文件路径}（只读索引，不加载配置）"""
+    # config/config.yaml 是应用配置而不是工作流
+    app_config = Path(__file__).parent.parent / "config" / "config.yaml"
+    return {name: path for name, path in _workflow_config_index().items() if path != app_config}
+
+
 class ConfigWorkflow(BaseWorkflow):
     """
     配置驱动的工作流
@@ -75,7 +125,8 @@ class ConfigWorkflow(BaseWorkflow):
                 workflow_router=workflow_router
             )
 
-            # 6. 初始化LangGraph引擎
+            # 6. 初始化LangGraph引擎（执行时才导入，导入 src.core 不连带加载 langgraph）
+            from ..engines.langgraph_engine import LangGraphEngine
             self.engine = LangGraphEngine(
                 self.config, 
                 agent_service, 
@@ -142,7 +193,7 @@ class ConfigWorkflow(BaseWorkflow):
 
         # 加载YAML配置
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f) or {}
+            config = yaml.load(f, Loader=_YamlLoader) or {}
 
         # 验证配置
         self._validate_config(config)
@@ -151,26 +202,7 @@ class ConfigWorkflow(BaseWorkflow):
 
     def _find_config_file(self) -> Optional[Path]:
         """查找配置文件"""
-        # 从项目根目录查找 (src目录)
-        project_root = Path(__file__).parent.parent
-
-        # 可能的配置文件位置（优先workflow package）
-        possible_paths = [
-            # 新格式：workflow package内的workflow.yaml
-            project_root / "workflows" / self.context.workflow_name / "workflow.yaml",
-            project_root / "workflows" / self.context.workflow_name / "workflow.yml",
-            # 兼容旧格式
-            project_root / "config" / f"{self.context.workflow_name}.yaml",
-            project_root / "config" / f"{self.context.workflow_name}.yml",
-            project_root / "workflows" / f"{self.context.workflow_name}.yaml",
-            project_root / "workflows" / f"{self.context.workflow_name}.yml",
-        ]
-
-        for path in possible_paths:
-            if path.exists():
-                return path
-
-        return None
+        return find_workflow_config(self.context.workflow_name)
     
     def _load_workflow_router(self) -> Optional[Any]:
         """
@@ -4,7 +4,7 @@
 
 from typing import Dict, Type
 from .workflow_base import BaseWorkflow, WorkflowContext
-from .config_workflow import ConfigWorkflow
+from .config_workflow import ConfigWorkflow, find_workflow_config
 
 
 class WorkflowFactory:
@@ -71,13 +71,14 @@ class WorkflowFactory:
             metadata={**context.metadata, **kwargs}
         )
 
-        # 首先尝试创建ConfigWorkflow
-        try:
-            config_workflow = ConfigWorkflow(full_context)
-            print(f"✅ Using config-driven workflow: {workflow_name}")
-            return config_workflow
-        except (FileNotFoundError, ImportError, ValueError) as e:
-            print(f"⚠️  Config workflow not available ({e}), falling back to class-based workflow")
+        # 首先尝试创建ConfigWorkflow（仅在存在配置文件时）
+        if find_workflow_config(workflow_name) is not None:
+            try:
+                config_workflow = ConfigWorkflow(full_context)
+                print(f"✅ Using config-driven workflow: {workflow_name}")
+                return config_workflow
+            except (FileNotFoundError, ImportError, ValueError) as e:
+                print(f"⚠️  Config workflow not available ({e}), falling back to class-based workflow")
 
         # 如果ConfigWorkflow不可用，使用传统注册类
         if workflow_name not in cls._registry:
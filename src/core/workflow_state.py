@@ -4,10 +4,27 @@ Workflow State Schema - LangGraph状态定义
 定义LangGraph使用的工作流状态结构。
 """
 
-from typing import TypedDict, Optional, List, Dict, Any
+import operator
+import time
+from collections import deque
+from typing import TypedDict, Optional, List, Dict, Any, Deque, Iterable, Annotated
 from langchain_core.messages import BaseMessage
 
 
+def append_recent(left: Optional[Iterable], right: Optional[Iterable]) -> deque:
+    """
+    追加合并reducer：把本轮新增的记录追加到已有记录之后
+
+    保留已有deque的maxlen（只保留最近的记录）；左侧尚未设置长度上限时沿用右侧的。
+    """
+    maxlen = getattr(left, "maxlen", None)
+    if maxlen is None:
+        maxlen = getattr(right, "maxlen", None)
+    merged = deque(left or (), maxlen=maxlen)
+    merged.extend(right or ())
+    return merged
+
+
 class WorkflowState(TypedDict, total=False):
     """
     LangGraph工作流状态
@@ -17,8 +34,8 @@ class WorkflowState(TypedDict, total=False):
     """
     
     # ============ Agent通信 ============
-    messages: List[BaseMessage]
-    """Agent间的消息历史（LangChain格式）"""
+    messages: Annotated[Deque[BaseMessage], append_recent]
+    """Agent间的消息历史（LangChain格式，只保留最近 history_limit 轮）"""
     
     # ============ 最新Agent执行信息 ============
     last_agent: str
@@ -38,15 +55,16 @@ class WorkflowState(TypedDict, total=False):
     # 动态字段：turn_count_{agent}_{state}
     # 例如：turn_count_client_supplier_clarify = 2
     
-    execution_history: List[Dict[str, Any]]
+    execution_history: Annotated[List[Dict[str, Any]], operator.add]
     """
     执行历史记录
     每个元素包含: {
         "state": str,           # 状态名
         "agent": str,           # Agent名
         "decisions": dict,      # 决策结果
-        "turn_count": int       # 轮次
+        "total_turns": int      # 轮次
     }
+    keep_full_responses 时还包含 "response" 和 "timestamp"，并与 agent_responses 中对应的记录是同一个对象
     """
     
     workspace_info: Dict[str, Any]
@@ -77,10 +95,10 @@ class WorkflowState(TypedDict, total=False):
     start_time: Optional[float]
     """工作流开始时间（时间戳）"""
     
-    agent_responses: Optional[List[Dict[str, Any]]]
+    agent_responses: Annotated[Deque[Dict[str, Any]], append_recent]
     """
-    所有Agent响应的完整记录（可选）
-    每个元素包含: {
+    最近的Agent响应完整记录（默认只保留最近一轮，keep_full_responses 时保留 history_limit 轮）
+    元素与 execution_history 中的记录相同，主要使用: {
         "state": str,
         "agent": str,
         "response": dict,
@@ -89,10 +107,22 @@ class WorkflowState(TypedDict, total=False):
     """
 
 
+# 初始状态中不可变的默认值，每次创建时直接复制；可变容器和时间戳在 create_initial_state 中逐次新建
+_INITIAL_STATE_TEMPLATE: Dict[str, Any] = {
+    "last_agent": "",
+    "last_content": "",
+    "total_turns": 0,  # 总交互次数（系统内部）
+    "error": None,
+    "error_state": None,
+}
+
+
 def create_initial_state(
     workflow_name: str,
     initial_message: str,
-    workspace_info: Dict[str, Any]
+    workspace_info: Dict[str, Any],
+    history_limit: Optional[int] = None,
+    response_limit: Optional[int] = None
 ) -> WorkflowState:
     """
     创建初始工作流状态
@@ -101,26 +131,22 @@ def create_initial_state(
         workflow_name: 工作流名称
         initial_message: 初始任务目标
         workspace_info: 工作区信息
+        history_limit: messages/agent_responses 保留的最近轮数（None表示不限制）
+        response_limit: agent_responses 单独的保留轮数（默认同 history_limit）
         
     Returns:
         WorkflowState: 初始化的状态对象
     """
-    import time
-    
     return WorkflowState(
-        messages=[],
-        last_agent="",
-        last_content="",
+        _INITIAL_STATE_TEMPLATE,
+        messages=deque(maxlen=history_limit * 2 if history_limit else None),
         decisions={},
-        total_turns=0,  # 总交互次数（系统内部）
         execution_history=[],
         workspace_info=workspace_info,
         initial_message=initial_message,
         workflow_name=workflow_name,
-        error=None,
-        error_state=None,
         start_time=time.time(),
-        agent_responses=[]
+        agent_responses=deque(maxlen=response_limit if response_limit is not None else history_limit)
     )
 
 
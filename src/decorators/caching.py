@@ -4,69 +4,202 @@
 提供方法结果缓存功能，避免重复计算。
 """
 
-from functools import wraps, lru_cache
+from collections import OrderedDict
+from functools import wraps, lru_cache, cached_property as _functools_cached_property
 import hashlib
+import math
+import os
 import pickle
+import pickletools
 from pathlib import Path
-from typing import Any, Callable
+from time import time as _now
+from typing import Any, Callable, Optional
 
+# 可选依赖：orjson 加速JSON序列化，zstandard 压缩缓存文件，blake3 计算缓存键
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def memoize(func: Callable) -> Callable:
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 缓存文件头：第1字节为序列化格式，第2字节为压缩方式
+_FORMAT_JSON = b"J"
+_FORMAT_PICKLE = b"P"
+_CODEC_RAW = b"-"
+_CODEC_ZSTD = b"Z"
+
+# repr() 能精确区分的参数类型，缓存键可以跳过pickle
+_SCALAR_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def _cache_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """生成缓存键
+
+    参数全部为标量时直接拼接repr，否则回退到pickle以保证键的精确性；
+    哈希优先使用blake3，未安装时使用hashlib.blake2b。
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    if (all(type(arg) in _SCALAR_TYPES for arg in args)
+            and all(type(value) in _SCALAR_TYPES for value in kwargs.values())):
+        key_data = "|".join((name, repr(args), repr(sorted(kwargs.items())))).encode()
+    else:
+        key_data = pickle.dumps((name, args, kwargs))
+
+    if blake3 is not None:
+        return blake3.blake3(key_data).hexdigest(16)
+    return hashlib.blake2b(key_data, digest_size=16).hexdigest()
+
+
+def _is_plain_json(value: Any) -> bool:
+    """检查值是否可以通过JSON无损往返（类型精确匹配，不接受子类）"""
+    value_type = type(value)
+    if value_type in (str, int, bool) or value is None:
+        return True
+    if value_type is float:
+        return math.isfinite(value)
+    if value_type is list:
+        return all(_is_plain_json(item) for item in value)
+    if value_type is dict:
+        return all(type(k) is str and _is_plain_json(v) for k, v in value.items())
+    return False
+
+
+def _dump_cache_value(value: Any) -> bytes:
+    """序列化缓存值：纯JSON数据用orjson，其他对象用pickle协议5"""
+    header = payload = None
+    if orjson is not None and _is_plain_json(value):
+        try:
+            header, payload = _FORMAT_JSON, orjson.dumps(value)
+        except TypeError:
+            # orjson 不支持的值（如超过64位的整数）回退到pickle
+            pass
+    if payload is None:
+        header, payload = _FORMAT_PICKLE, pickletools.optimize(pickle.dumps(value, protocol=5))
+
+    if zstandard is not None:
+        return header + _CODEC_ZSTD + zstandard.ZstdCompressor(level=1).compress(payload)
+    return header + _CODEC_RAW + payload
+
+
+def _load_cache_value(data: bytes) -> Any:
+    """根据文件头反序列化缓存值，格式无法识别时抛出ValueError"""
+    header, codec, payload = data[:1], data[1:2], data[2:]
+
+    if codec == _CODEC_ZSTD:
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec != _CODEC_RAW:
+        raise ValueError(f"Unknown cache codec: {codec!r}")
+
+    if header == _FORMAT_JSON:
+        return orjson.loads(payload)
+    if header == _FORMAT_PICKLE:
+        return pickle.loads(payload)
+    raise ValueError(f"Unknown cache format: {header!r}")
+
+
+def memoize(func: Optional[Callable] = None, *, maxsize: Optional[int] = 128) -> Callable:
     """简单的内存缓存装饰器
 
     使用LRU缓存方法结果，避免重复计算相同输入。
+    直接返回 lru_cache 包装后的函数，不额外增加一层调用栈。
+
+    使用示例:
+        @memoize
+        def load(path): ...
+
+        @memoize(maxsize=None)  # 纯函数且输入有限时使用，命中路径无LRU维护开销
+        def parse(expr): ...
     """
-    @wraps(func)
-    @lru_cache(maxsize=128)
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-    return wrapper
+    def decorator(f: Callable) -> Callable:
+        return lru_cache(maxsize=maxsize)(f)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 
-def cached_property(func: Callable) -> property:
+def cached_property(func: Callable) -> _functools_cached_property:
     """缓存属性装饰器
 
     将方法转换为缓存的属性，只计算一次后缓存结果。
+    结果直接存入实例 __dict__，之后的访问是普通属性读取，不再经过描述符；
+    需要重新计算时 `del obj.<name>` 即可。
     """
-    @wraps(func)
-    def wrapper(self):
-        cache_key = f"_cached_{func.__name__}"
-        if not hasattr(self, cache_key):
-            setattr(self, cache_key, func(self))
-        return getattr(self, cache_key)
-    return property(wrapper)
+    return _functools_cached_property(func)
 
 
-def file_cache(cache_dir: str = ".cache", max_age: int = 3600):
+def file_cache(cache_dir: str = ".cache", max_age: int = 3600, max_entries: int = 256):
     """文件缓存装饰器
 
     将函数结果缓存到文件系统，避免重复计算。
+    磁盘之上有一层进程内LRU（每个函数最多max_entries条，0表示关闭），
+    同一进程内重复调用直接从内存返回，不再访问文件系统；内存层同样遵守max_age。
+    注意：内存层命中时返回的是同一个对象，调用方不应修改返回值。
     """
     def decorator(func: Callable) -> Callable:
+        # 内存层：{cache_key: (写入时间, 结果)}
+        memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+        def remember(cache_key: str, stored_at: float, value: Any) -> None:
+            if max_entries <= 0:
+                return
+            memory[cache_key] = (stored_at, value)
+            memory.move_to_end(cache_key)
+            while len(memory) > max_entries:
+                memory.popitem(last=False)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             # 生成缓存键
-            key_data = pickle.dumps((func.__name__, args, kwargs))
-            cache_key = hashlib.md5(key_data).hexdigest()
-            cache_file = Path(cache_dir) / f"{cache_key}.pkl"
-
-            # 检查缓存是否存在且未过期
-            if cache_file.exists():
-                import time
-                file_age = time.time() - cache_file.stat().st_mtime
-                if file_age < max_age:
+            cache_key = _cache_key(func, args, kwargs)
+            now = _now()
+
+            # 先查内存层
+            entry = memory.get(cache_key)
+            if entry is not None:
+                if now - entry[0] < max_age:
                     try:
-                        with open(cache_file, 'rb') as f:
-                            return pickle.load(f)
-                    except Exception:
-                        pass  # 缓存文件损坏，重新计算
+                        memory.move_to_end(cache_key)
+                    except KeyError:
+                        pass  # 并发淘汰，不影响返回
+                    return entry[1]
+                memory.pop(cache_key, None)
+
+            cache_file = os.path.join(cache_dir, f"{cache_key}.pkl")
+
+            # 检查缓存是否存在且未过期（单次stat同时完成存在性和时间检查）
+            try:
+                mtime = os.stat(cache_file).st_mtime
+            except FileNotFoundError:
+                mtime = None
+
+            if mtime is not None and now - mtime < max_age:
+                try:
+                    with open(cache_file, 'rb') as f:
+                        result = _load_cache_value(f.read())
+                    remember(cache_key, mtime, result)
+                    return result
+                except Exception:
+                    pass  # 缓存文件损坏，重新计算
 
             # 计算结果并缓存
             result = func(*args, **kwargs)
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            remember(cache_key, _now(), result)
             try:
+                data = _dump_cache_value(result)
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
                 with open(cache_file, 'wb') as f:
-                    pickle.dump(result, f)
+                    f.write(data)
             except Exception:
                 pass  # 缓存失败不影响正常执行
 
@@ -4,6 +4,7 @@
 提供统一的异常处理机制，避免在业务逻辑中出现try-catch的额外缩进。
 """
 
+import inspect
 from functools import wraps
 from ..diagnostics.exceptions import ConfigurationError, WorkflowException, ExecutionError
 
@@ -72,47 +73,60 @@ def agent_operation_error_handler(func):
 def langgraph_node_error_handler(func):
     """LangGraph节点错误处理装饰器
     
-    捕获异常，记录日志，并更新state中的error字段，而不是抛出异常中断图执行。
+    捕获异常，记录日志，并返回只包含error字段的状态增量，而不是抛出异常中断图执行。
     """
     @wraps(func)
     def wrapper(self, state, *args, **kwargs):
         try:
             return func(self, state, *args, **kwargs)
         except Exception as e:
-            state_name = state.get("name", "unknown")
+            # 节点函数的第一个参数是state配置（包含状态名）
+            state_config = args[0] if args and isinstance(args[0], dict) else state
+            state_name = state_config.get("name", "unknown")
             if hasattr(self, 'logger'):
                 self.logger.error(f"❌ Error in node execution '{state_name}': {e}")
             
-            state["error"] = str(e)
-            state["error_state"] = state_name
-            return state
+            return {"error": str(e), "error_state": state_name}
     return wrapper
 
 
+def _execution_error_result(self, error: Exception, initial_state_data) -> dict:
+    """记录执行异常并构建标准错误结果字典"""
+    if hasattr(self, 'logger'):
+        self.logger.error(f"❌ Workflow execution failed: {error}")
+    
+    return {
+        "success": False,
+        "final_content": "",
+        "total_turns": initial_state_data.get("total_turns", 0) if initial_state_data else 0,
+        "agents_used": [],
+        "metadata": {
+            "error": str(error),
+            "execution_history": initial_state_data.get("execution_history", []) if initial_state_data else []
+        }
+    }
+
+
 def langgraph_execution_handler(func):
     """LangGraph执行错误处理装饰器
     
-    捕获异常并返回标准错误结果字典。
+    捕获异常并返回标准错误结果字典。同时支持同步函数和协程函数。
     """
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(self, context, initial_state_data=None, *args, **kwargs):
+            try:
+                return await func(self, context, initial_state_data, *args, **kwargs)
+            except Exception as e:
+                return _execution_error_result(self, e, initial_state_data)
+        return async_wrapper
+
     @wraps(func)
     def wrapper(self, context, initial_state_data=None, *args, **kwargs):
         try:
             return func(self, context, initial_state_data, *args, **kwargs)
         except Exception as e:
-            if hasattr(self, 'logger'):
-                self.logger.error(f"❌ Workflow execution failed: {e}")
-            
-            # 构建错误结果
-            return {
-                "success": False,
-                "final_content": "",
-                "total_turns": initial_state_data.get("total_turns", 0) if initial_state_data else 0,
-                "agents_used": [],
-                "metadata": {
-                    "error": str(e),
-                    "execution_history": initial_state_data.get("execution_history", []) if initial_state_data else []
-                }
-            }
+            return _execution_error_result(self, e, initial_state_data)
     return wrapper
 
 
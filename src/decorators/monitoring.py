@@ -4,62 +4,115 @@
 提供方法执行时间监控、调用日志记录等功能。
 """
 
-import time
+import os
+import sys
+import array
 import logging
+from time import perf_counter_ns as _pcn
 from functools import wraps
 from typing import Callable, Any
-from ..diagnostics.logging import get_logger
+from ..diagnostics.logging import get_raw_logger
+
+try:
+    import resource
+    _HAS_RUSAGE = True
+except ImportError:  # Windows
+    resource = None
+    _HAS_RUSAGE = False
+
+# ru_maxrss 在macOS上单位为字节，Linux上为KB
+_RUSAGE_TO_MB = 1 / 1024 / 1024 if sys.platform == "darwin" else 1 / 1024
+
+_proc = None  # psutil.Process 单例，按需创建
+
+
+def _time_sample() -> int:
+    """读取 FASTANTS_TIME_SAMPLE（装饰时调用），无法解析时按1处理，不影响模块导入"""
+    try:
+        return max(1, int(os.environ.get("FASTANTS_TIME_SAMPLE", "1")))
+    except ValueError:
+        return 1
 
 
 def time_execution(func: Callable) -> Callable:
     """执行时间监控装饰器
 
-    记录方法执行时间，便于性能分析。
+    记录方法执行时间（单调时钟，毫秒），便于性能分析。
+    环境变量 FASTANTS_TIME_SAMPLE=N (N>1) 时改为每N次成功调用输出一条汇总日志（次数/平均/最小/最大）。
     """
+    name = func.__name__
+    sample = _time_sample()
+    # 汇总统计: [次数, 总耗时, 最小, 最大]（毫秒）
+    stats = array.array('d', [0.0, 0.0, float('inf'), 0.0])
+
     @wraps(func)
     def wrapper(*args, **kwargs) -> Any:
-        logger = get_logger()
-        start_time = time.time()
+        t0 = _pcn()
 
         try:
             result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
+        except Exception as e:
+            get_raw_logger().error("%s failed after %.3fms: %s", name, (_pcn() - t0) / 1e6, e)
+            raise
 
-            logger.debug(f"{func.__name__} executed in {execution_time:.3f}s")
+        if sample == 1:
+            logger = get_raw_logger()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s executed in %.3fms", name, (_pcn() - t0) / 1e6)
             return result
 
-        except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"{func.__name__} failed after {execution_time:.3f}s: {e}")
-            raise
+        elapsed = (_pcn() - t0) / 1e6
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed < stats[2]:
+            stats[2] = elapsed
+        if elapsed > stats[3]:
+            stats[3] = elapsed
+
+        if stats[0] >= sample:
+            count, total, low, high = stats
+            stats[0], stats[1], stats[2], stats[3] = 0.0, 0.0, float('inf'), 0.0
+            logger = get_raw_logger()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s executed %d times: mean %.3fms, min %.3fms, max %.3fms",
+                             name, count, total / count, low, high)
+        return result
 
     return wrapper
 
 
+def _format_call_args(args: tuple, kwargs: dict) -> str:
+    """格式化调用参数（跳过self）"""
+    parts = [repr(arg) for arg in args[1:]]
+    parts.extend(f"{k}={v!r}" for k, v in kwargs.items())
+    return ", ".join(parts)
+
+
 def log_method_calls(level: str = "DEBUG") -> Callable:
     """方法调用日志装饰器
 
     记录方法的调用情况，包括参数和返回值。
+    日志级别在装饰时解析；级别未启用时直接调用原方法，不做任何参数格式化。
     """
+    numeric_level = getattr(logging, level.upper())
+
     def decorator(func: Callable) -> Callable:
+        name = func.__name__
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            logger = get_logger()
+            logger = get_raw_logger()
+            if not logger.isEnabledFor(numeric_level):
+                return func(*args, **kwargs)
 
             # 记录方法调用
-            if logger.isEnabledFor(getattr(logging, level)):
-                args_str = ", ".join(repr(arg) for arg in args[1:])  # 跳过self
-                kwargs_str = ", ".join(f"{k}={repr(v)}" for k, v in kwargs.items())
-                params = ", ".join(filter(None, [args_str, kwargs_str]))
-
-                getattr(logger, level.lower())(f"Calling {func.__name__}({params})")
+            logger.log(numeric_level, "Calling %s(%s)", name, _format_call_args(args, kwargs))
 
             # 执行方法
             result = func(*args, **kwargs)
 
-            # 记录返回值
-            if logger.isEnabledFor(getattr(logging, level)):
-                getattr(logger, level.lower())(f"{func.__name__} returned: {repr(result)}")
+            # 记录返回值（%r延迟到真正输出时才计算）
+            logger.log(numeric_level, "%s returned: %r", name, result)
 
             return result
 
@@ -81,32 +134,46 @@ def count_calls(func: Callable) -> Callable:
     return wrapper
 
 
+def _psutil_process():
+    """获取当前进程的psutil.Process（惰性创建，缺少psutil时抛出ImportError）"""
+    global _proc
+    if _proc is None:
+        import psutil
+        _proc = psutil.Process()
+    return _proc
+
+
 def profile_memory(func: Callable) -> Callable:
     """内存使用监控装饰器
 
     监控方法执行时的内存使用情况。
+    优先使用resource.getrusage（报告进程峰值RSS），不可用时回退到psutil（当前RSS）。
     """
     @wraps(func)
     def wrapper(*args, **kwargs) -> Any:
-        try:
-            import psutil
-            import os
+        logger = get_raw_logger()
+        if not logger.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
 
-            process = psutil.Process(os.getpid())
+        if _HAS_RUSAGE:
+            mem_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RUSAGE_TO_MB
+            result = func(*args, **kwargs)
+            mem_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RUSAGE_TO_MB
+            label = "Peak memory"
+        else:
+            try:
+                process = _psutil_process()
+            except ImportError:
+                # 如果没有psutil，直接执行
+                return func(*args, **kwargs)
             mem_before = process.memory_info().rss / 1024 / 1024  # MB
-
             result = func(*args, **kwargs)
-
             mem_after = process.memory_info().rss / 1024 / 1024  # MB
-            mem_delta = mem_after - mem_before
+            label = "Memory usage"
 
-            logger = get_logger()
-            logger.debug(f"Memory usage: {mem_before:.2f}MB -> {mem_after:.2f}MB (Δ{mem_delta:+.2f}MB)")
-            return result
-
-        except ImportError:
-            # 如果没有psutil，直接执行
-            return func(*args, **kwargs)
+        logger.debug("%s: %.2fMB -> %.2fMB (Δ%+.2fMB)",
+                     label, mem_before, mem_after, mem_after - mem_before)
+        return result
 
     return wrapper
 
@@ -114,28 +181,27 @@ def profile_memory(func: Callable) -> Callable:
 def trace_execution(depth: int = 1) -> Callable:
     """执行追踪装饰器
 
-    记录方法执行的调用栈信息。
+    记录方法执行的调用栈信息。仅在DEBUG级别启用时才获取调用栈。
     """
     def decorator(func: Callable) -> Callable:
+        name = func.__name__
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            import inspect
-
-            logger = get_logger()
+            logger = get_raw_logger()
+            if not logger.isEnabledFor(logging.DEBUG):
+                return func(*args, **kwargs)
 
-            # 获取调用栈信息
-            frame = inspect.currentframe()
+            # 获取调用者栈帧（超出调用栈深度时为None）
             try:
-                # 向上查找调用者
-                for _ in range(depth + 1):
-                    frame = frame.f_back
-                    if frame is None:
-                        break
-
-                if frame:
-                    caller_info = f"{frame.f_code.co_name} in {frame.f_code.co_filename}:{frame.f_lineno}"
-                    logger.debug(f"{func.__name__} called from: {caller_info}")
-            finally:
+                frame = sys._getframe(depth + 1)
+            except ValueError:
+                frame = None
+
+            if frame is not None:
+                code = frame.f_code
+                logger.debug("%s called from: %s in %s:%s",
+                             name, code.co_name, code.co_filename, frame.f_lineno)
                 del frame
 
             return func(*args, **kwargs)
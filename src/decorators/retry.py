@@ -5,10 +5,20 @@
 """
 
 import time
+import array
 import random
+import threading
 from functools import wraps
 from typing import Callable, Any, Type
 
+# 预先生成的抖动系数表 [0.5, 1.0)，按线程和重试次数选取，避免在重试循环中调用随机数生成器
+_JITTER = tuple(0.5 + random.SystemRandom().random() * 0.5 for _ in range(16))
+
+
+def _jitter(attempt: int) -> float:
+    """按线程和重试次数取抖动系数（线程ident低位通常对齐，先右移）"""
+    return _JITTER[(attempt ^ (threading.get_ident() >> 12)) & 15]
+
 
 def retry_on_failure(
     max_attempts: int = 3,
@@ -34,11 +44,13 @@ def retry_on_failure(
             # 可能失败的操作
             pass
     """
+    # 每次重试前的延迟在装饰时预先算好
+    delays = tuple(delay * backoff ** i for i in range(max_attempts))
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             last_exception = None
-            current_delay = delay
 
             for attempt in range(max_attempts):
                 try:
@@ -47,14 +59,11 @@ def retry_on_failure(
                     last_exception = e
 
                     if attempt < max_attempts - 1:  # 不是最后一次尝试
-                        # 计算延迟时间
-                        actual_delay = current_delay
+                        # 添加随机抖动，避免惊群效应
                         if jitter:
-                            # 添加随机抖动，避免惊群效应
-                            actual_delay *= (0.5 + random.random() * 0.5)
-
-                        time.sleep(actual_delay)
-                        current_delay *= backoff
+                            time.sleep(delays[attempt] * _jitter(attempt))
+                        else:
+                            time.sleep(delays[attempt])
 
             # 所有重试都失败了
             raise last_exception
@@ -73,28 +82,38 @@ def exponential_backoff(
 
     使用指数退避策略，避免服务过载。
     """
+    # 指数退避延迟在装饰时预先算好
+    delays = tuple(min(base_delay * (2 ** i), max_delay) for i in range(max_attempts))
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
+            last_exception = None
+
             for attempt in range(max_attempts):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
+                    last_exception = e
+
                     if attempt < max_attempts - 1:
-                        # 计算指数退避延迟
-                        delay = min(base_delay * (2 ** attempt), max_delay)
                         if jitter:
-                            delay *= (0.5 + random.random() * 0.5)
-
-                        time.sleep(delay)
+                            time.sleep(delays[attempt] * _jitter(attempt))
+                        else:
+                            time.sleep(delays[attempt])
 
             # 重新抛出最后一个异常
-            raise
+            raise last_exception
 
         return wrapper
     return decorator
 
 
+# 熔断器状态数组的下标与状态值
+_FAILURES, _LAST_FAILURE, _STATE = 0, 1, 2
+_CLOSED, _OPEN, _HALF_OPEN = 0, 1, 2
+
+
 def circuit_breaker(
     failure_threshold: int = 5,
     recovery_timeout: float = 60.0,
@@ -105,44 +124,45 @@ def circuit_breaker(
     当失败次数超过阈值时，打开熔断器一段时间，避免继续调用失败的服务。
     """
     def decorator(func: Callable) -> Callable:
-        # 熔断器状态
-        failures = 0
-        last_failure_time = 0
-        state = "closed"  # closed, open, half_open
+        # 熔断器状态: [失败次数, 最后失败时间(ns), 状态]
+        state = array.array('q', [0, 0, _CLOSED])
+        lock = threading.Lock()
+        timeout_ns = int(recovery_timeout * 1e9)
 
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            nonlocal failures, last_failure_time, state
-
-            current_time = time.time()
-
-            # 检查是否需要从打开状态转换到半开状态
-            if state == "open" and current_time - last_failure_time > recovery_timeout:
-                state = "half_open"
+            if state[_STATE] != _CLOSED:
+                with lock:
+                    # 检查是否需要从打开状态转换到半开状态
+                    if (state[_STATE] == _OPEN
+                            and time.monotonic_ns() - state[_LAST_FAILURE] > timeout_ns):
+                        state[_STATE] = _HALF_OPEN
 
-            # 熔断器打开状态，直接抛出异常
-            if state == "open":
-                raise Exception("Circuit breaker is OPEN")
+                    # 熔断器打开状态，直接抛出异常
+                    if state[_STATE] == _OPEN:
+                        raise Exception("Circuit breaker is OPEN")
 
             try:
                 result = func(*args, **kwargs)
-
-                # 成功调用，重置失败计数
-                if state == "half_open":
-                    state = "closed"
-                failures = 0
-
-                return result
-
             except expected_exceptions as e:
-                failures += 1
-                last_failure_time = current_time
+                with lock:
+                    state[_FAILURES] += 1
+                    state[_LAST_FAILURE] = time.monotonic_ns()
 
-                # 检查是否需要打开熔断器
-                if failures >= failure_threshold:
-                    state = "open"
+                    # 检查是否需要打开熔断器
+                    if state[_FAILURES] >= failure_threshold:
+                        state[_STATE] = _OPEN
 
                 raise e
 
+            # 成功调用，重置失败计数
+            if state[_FAILURES] or state[_STATE] != _CLOSED:
+                with lock:
+                    state[_FAILURES] = 0
+                    if state[_STATE] == _HALF_OPEN:
+                        state[_STATE] = _CLOSED
+
+            return result
+
         return wrapper
     return decorator
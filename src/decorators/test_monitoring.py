@@ -0,0 +1,42 @@
+"""
+监控装饰器测试 - 测试 time_execution 的采样配置
+"""
+
+import os
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# 添加父目录到路径，以便导入模块
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.decorators.monitoring import time_execution, _time_sample
+
+
+class TestTimeExecution(unittest.TestCase):
+    """time_execution 装饰器测试类"""
+
+    def test_sample_from_environment(self):
+        """测试采样间隔的解析"""
+        with mock.patch.dict(os.environ, {"FASTANTS_TIME_SAMPLE": "5"}):
+            self.assertEqual(_time_sample(), 5)
+        with mock.patch.dict(os.environ, {"FASTANTS_TIME_SAMPLE": "0"}):
+            self.assertEqual(_time_sample(), 1)
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(_time_sample(), 1)
+
+    def test_malformed_sample_falls_back(self):
+        """测试无法解析的采样间隔不会让装饰（模块导入）失败"""
+        with mock.patch.dict(os.environ, {"FASTANTS_TIME_SAMPLE": "abc"}):
+            self.assertEqual(_time_sample(), 1)
+
+            @time_execution
+            def add(a, b):
+                return a + b
+
+        self.assertEqual(add(1, 2), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,8 @@
 提供输入输出数据验证功能。
 """
 
-from functools import wraps
+import re
+from functools import wraps, lru_cache
 from typing import Callable, Any, Type, Union
 from ..diagnostics.exceptions import ValidationError
 
@@ -14,25 +15,22 @@ def validate_input(*validators) -> Callable:
 
     验证方法输入参数是否符合要求。
     """
+    # 装饰时预先筛出有效的验证器，位置下标已跳过self参数
+    active = tuple((i + 1, i, v) for i, v in enumerate(validators) if v)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            # 跳过self参数
-            actual_args = args[1:] if args else ()
-
-            # 验证位置参数
-            for i, arg in enumerate(actual_args):
-                if i < len(validators) and validators[i]:
-                    validator_func = validators[i]
-                    if not validator_func(arg):
-                        raise ValidationError(
-                            f"Input validation failed for argument {i} in {func.__name__}: {arg}"
-                        )
-
-            # 验证关键字参数
-            for key, value in kwargs.items():
-                # 这里可以扩展为支持关键字参数验证
-                pass
+            # 验证位置参数（关键字参数暂不验证）
+            n_args = len(args)
+            for pos, i, validator_func in active:
+                if pos >= n_args:
+                    break
+                arg = args[pos]
+                if not validator_func(arg):
+                    raise ValidationError(
+                        f"Input validation failed for argument {i} in {func.__name__}: {arg}"
+                    )
 
             return func(*args, **kwargs)
 
@@ -100,14 +98,19 @@ def of_type(expected_type: Type) -> Callable:
     return validator
 
 
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> "re.Pattern":
+    """编译正则表达式（相同模式共享编译结果）"""
+    return re.compile(pattern)
+
+
 def matches_pattern(pattern: str) -> Callable:
     """创建正则表达式验证器"""
-    import re
-    compiled_pattern = re.compile(pattern)
+    match = _compile_pattern(pattern).match
 
     def validator(value: str) -> bool:
         try:
-            return bool(compiled_pattern.match(str(value)))
+            return bool(match(value if value.__class__ is str else str(value)))
         except (TypeError, AttributeError):
             return False
 
@@ -115,15 +118,23 @@ def matches_pattern(pattern: str) -> Callable:
 
 
 # 组合验证器
+def _fuse_validators(validators: tuple, op: str, empty: bool) -> Callable:
+    """生成把多个验证器用 and/or 串联的单个函数（构造时生成一次，调用时无生成器开销）"""
+    if not validators:
+        return lambda value: empty
+
+    params = ", ".join(f"f{i}=f{i}" for i in range(len(validators)))
+    body = f" {op} ".join(f"f{i}(value)" for i in range(len(validators)))
+    namespace = {f"f{i}": v for i, v in enumerate(validators)}
+    exec(f"def combined_validator(value, {params}):\n    return bool({body})", namespace)
+    return namespace["combined_validator"]
+
+
 def all_validators(*validators) -> Callable:
     """组合多个验证器（必须全部通过）"""
-    def combined_validator(value: Any) -> bool:
-        return all(validator(value) for validator in validators)
-    return combined_validator
+    return _fuse_validators(validators, "and", True)
 
 
 def any_validator(*validators) -> Callable:
     """组合多个验证器（只需一个通过）"""
-    def combined_validator(value: Any) -> bool:
-        return any(validator(value) for validator in validators)
-    return combined_validator
+    return _fuse_validators(validators, "or", False)
@@ -25,10 +25,8 @@ from .exceptions import (
 from .logging import (
     WorkflowLogger,
     get_logger,
-    log_info,
-    log_error,
-    log_warning,
-    log_debug
+    get_raw_logger,
+    _LOG_NAMES
 )
 
 __all__ = [
@@ -54,8 +52,19 @@ __all__ = [
     # 日志功能
     'WorkflowLogger',
     'get_logger',
+    'get_raw_logger',
     'log_info',
     'log_error',
     'log_warning',
     'log_debug'
 ]
+
+
+def __getattr__(name: str):
+    # log_* 在首次访问时才转发到 .logging（绑定时会创建日志器单例），导入本包时不创建
+    if name not in _LOG_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import logging as _logging
+    value = getattr(_logging, name)
+    globals()[name] = value
+    return value
@@ -8,92 +8,124 @@ from typing import Optional, Dict, Any
 class WorkflowException(Exception):
     """工作流基础异常"""
 
+    __slots__ = ("error_code", "_context", "_prefix")
+
     def __init__(self, message: str, error_code: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
         super().__init__(message)
         self.error_code = error_code or "UNKNOWN_ERROR"
-        self.context = context or {}
+        self._context = context
+        # 预先计算错误码前缀，__str__时直接拼接
+        self._prefix = f"[{self.error_code}] " if self.error_code != "UNKNOWN_ERROR" else ""
+
+    @property
+    def context(self) -> Dict[str, Any]:
+        """错误上下文
+
+        子类把上下文字段存放在各自的 __slots__ 中，只有在读取时才组装成字典。
+        """
+        if self._context is None:
+            context = {}
+            for klass in type(self).__mro__:
+                if klass is WorkflowException:
+                    break
+                for name in klass.__dict__.get("__slots__", ()):
+                    context[name] = getattr(self, name)
+            self._context = context
+        return self._context
+
+    @context.setter
+    def context(self, value: Optional[Dict[str, Any]]):
+        self._context = value
 
     def __str__(self):
-        if self.error_code != "UNKNOWN_ERROR":
-            return f"[{self.error_code}] {super().__str__()}"
-        return super().__str__()
+        return self._prefix + Exception.__str__(self)
+
+    def __reduce__(self):
+        # __slots__ 中的属性不在 __dict__ 里，需要显式带上以支持pickle（多进程/缓存）
+        state = dict(getattr(self, "__dict__", {}))
+        for klass in type(self).__mro__:
+            for name in klass.__dict__.get("__slots__", ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return (self.__class__, self.args, state)
 
 
 class ConfigurationError(WorkflowException):
     """配置相关错误"""
 
+    __slots__ = ("config_path", "field")
+
     def __init__(self, message: str, config_path: Optional[str] = None, field: Optional[str] = None):
-        super().__init__(
-            message,
-            "CONFIG_ERROR",
-            {"config_path": config_path, "field": field}
-        )
+        super().__init__(message, "CONFIG_ERROR")
+        self.config_path = config_path
+        self.field = field
 
 
 class ValidationError(WorkflowException):
     """验证相关错误"""
 
+    __slots__ = ("field", "value")
+
     def __init__(self, message: str, field: Optional[str] = None, value: Optional[Any] = None):
-        super().__init__(
-            message,
-            "VALIDATION_ERROR",
-            {"field": field, "value": value}
-        )
+        super().__init__(message, "VALIDATION_ERROR")
+        self.field = field
+        self.value = value
 
 
 class ExecutionError(WorkflowException):
     """执行相关错误"""
 
+    __slots__ = ("workflow_name", "state_name", "agent_name")
+
     def __init__(self, message: str, workflow_name: Optional[str] = None, state_name: Optional[str] = None, agent_name: Optional[str] = None):
-        super().__init__(
-            message,
-            "EXECUTION_ERROR",
-            {"workflow_name": workflow_name, "state_name": state_name, "agent_name": agent_name}
-        )
+        super().__init__(message, "EXECUTION_ERROR")
+        self.workflow_name = workflow_name
+        self.state_name = state_name
+        self.agent_name = agent_name
 
 
 class AgentError(WorkflowException):
     """Agent相关错误"""
 
+    __slots__ = ("agent_name", "prompt")
+
     def __init__(self, message: str, agent_name: Optional[str] = None, prompt: Optional[str] = None):
-        super().__init__(
-            message,
-            "AGENT_ERROR",
-            {"agent_name": agent_name, "prompt": prompt}
-        )
+        super().__init__(message, "AGENT_ERROR")
+        self.agent_name = agent_name
+        self.prompt = prompt
 
 
 class ConditionError(WorkflowException):
     """条件评估相关错误"""
 
+    __slots__ = ("condition", "state")
+
     def __init__(self, message: str, condition: Optional[str] = None, state: Optional[Dict[str, Any]] = None):
-        super().__init__(
-            message,
-            "CONDITION_ERROR",
-            {"condition": condition, "state": state}
-        )
+        super().__init__(message, "CONDITION_ERROR")
+        self.condition = condition
+        self.state = state
 
 
 class FileSystemError(WorkflowException):
     """文件系统相关错误"""
 
+    __slots__ = ("path", "operation")
+
     def __init__(self, message: str, path: Optional[str] = None, operation: Optional[str] = None):
-        super().__init__(
-            message,
-            "FILESYSTEM_ERROR",
-            {"path": path, "operation": operation}
-        )
+        super().__init__(message, "FILESYSTEM_ERROR")
+        self.path = path
+        self.operation = operation
 
 
 class TimeoutError(WorkflowException):
     """超时错误"""
 
+    __slots__ = ("timeout_seconds", "operation")
+
     def __init__(self, message: str, timeout_seconds: Optional[int] = None, operation: Optional[str] = None):
-        super().__init__(
-            message,
-            "TIMEOUT_ERROR",
-            {"timeout_seconds": timeout_seconds, "operation": operation}
-        )
+        super().__init__(message, "TIMEOUT_ERROR")
+        self.timeout_seconds = timeout_seconds
+        self.operation = operation
 
 
 # 便捷异常创建函数
@@ -7,6 +7,14 @@ import sys
 from typing import Optional
 from pathlib import Path
 
+# 日志级别名称到数值的映射
+_LEVEL_MAP = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL
+}
 
 class WorkflowLogger:
     """工作流日志管理器"""
@@ -24,14 +32,7 @@ class WorkflowLogger:
         self.logger = logging.getLogger(name)
 
         # 设置日志级别
-        level_map = {
-            "DEBUG": logging.DEBUG,
-            "INFO": logging.INFO,
-            "WARNING": logging.WARNING,
-            "ERROR": logging.ERROR,
-            "CRITICAL": logging.CRITICAL
-        }
-        self.logger.setLevel(level_map.get(level.upper(), logging.INFO))
+        self.logger.setLevel(_LEVEL_MAP.get(level.upper(), logging.INFO))
 
         # 避免重复添加handler
         if not self.logger.handlers:
@@ -68,25 +69,25 @@ class WorkflowLogger:
             cls._instance = cls(level=level)
         return cls._instance
 
-    def info(self, message: str, **kwargs):
-        """记录信息日志"""
-        self.logger.info(message, extra=kwargs)
+    def info(self, message: str, *args, **kwargs):
+        """记录信息日志（args 按 % 格式延迟到确实输出时才格式化）"""
+        self.logger.info(message, *args, extra=kwargs)
 
-    def error(self, message: str, exc_info: bool = False, **kwargs):
+    def error(self, message: str, *args, exc_info: bool = False, **kwargs):
         """记录错误日志"""
-        self.logger.error(message, exc_info=exc_info, extra=kwargs)
+        self.logger.error(message, *args, exc_info=exc_info, extra=kwargs)
 
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """记录警告日志"""
-        self.logger.warning(message, extra=kwargs)
+        self.logger.warning(message, *args, extra=kwargs)
 
-    def debug(self, message: str, **kwargs):
+    def debug(self, message: str, *args, **kwargs):
         """记录调试日志"""
-        self.logger.debug(message, extra=kwargs)
+        self.logger.debug(message, *args, extra=kwargs)
 
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: str, *args, **kwargs):
         """记录严重错误日志"""
-        self.logger.critical(message, extra=kwargs)
+        self.logger.critical(message, *args, extra=kwargs)
 
     # 便捷方法
     def log_execution_start(self, workflow_name: str, **kwargs):
@@ -101,13 +102,13 @@ class WorkflowLogger:
     def log_state_transition(self, from_state: str, to_state: str, condition: str = "", **kwargs):
         """记录状态转移"""
         if condition:
-            self.debug(f"➡️ State transition: {from_state} -> {to_state} (condition: {condition})", **kwargs)
+            self.debug("➡️ State transition: %s -> %s (condition: %s)", from_state, to_state, condition, **kwargs)
         else:
-            self.debug(f"➡️ State transition: {from_state} -> {to_state}", **kwargs)
+            self.debug("➡️ State transition: %s -> %s", from_state, to_state, **kwargs)
 
     def log_agent_call(self, agent_name: str, prompt_length: int, **kwargs):
         """记录Agent调用"""
-        self.debug(f"🤖 Agent call: {agent_name} (prompt length: {prompt_length})", **kwargs)
+        self.debug("🤖 Agent call: %s (prompt length: %d)", agent_name, prompt_length, **kwargs)
 
     def log_config_loaded(self, config_path: str, **kwargs):
         """记录配置加载"""
@@ -119,27 +120,41 @@ class WorkflowLogger:
 
 
 # 全局便捷函数
-def get_logger(level: str = "INFO") -> WorkflowLogger:
-    """获取日志器实例"""
-    return WorkflowLogger.get_instance(level)
+_INSTANCE: Optional[WorkflowLogger] = None
 
 
-# 兼容性函数（用于替换print语句）
-def log_info(message: str, **kwargs):
-    """兼容性函数，替换print信息"""
-    get_logger().info(message, **kwargs)
+def _init_logger(level: str) -> WorkflowLogger:
+    """首次获取时初始化模块级单例（与 WorkflowLogger.get_instance 共用同一实例）"""
+    global _INSTANCE
+    _INSTANCE = WorkflowLogger.get_instance(level)
+    return _INSTANCE
 
 
-def log_error(message: str, exc_info: bool = False, **kwargs):
-    """兼容性函数，替换print错误"""
-    get_logger().error(message, exc_info=exc_info, **kwargs)
+def get_logger(level: str = "INFO") -> WorkflowLogger:
+    """获取日志器实例"""
+    return _INSTANCE if _INSTANCE is not None else _init_logger(level)
 
 
-def log_warning(message: str, **kwargs):
-    """兼容性函数，替换print警告"""
-    get_logger().warning(message, **kwargs)
+def get_raw_logger() -> logging.Logger:
+    """获取底层的logging.Logger（供装饰器等热路径使用，省去WorkflowLogger包装）"""
+    return (_INSTANCE if _INSTANCE is not None else _init_logger("INFO")).logger
 
 
-def log_debug(message: str, **kwargs):
-    """兼容性函数，替换print调试"""
-    get_logger().debug(message, **kwargs)
+# 兼容性函数（用于替换print语句）
+# log_info / log_error / log_warning / log_debug 在首次访问时直接绑定为
+# 单例日志器的方法并写回模块全局，之后每次调用不再经过get_logger()
+_LOG_NAMES = {
+    "log_info": "info",
+    "log_error": "error",
+    "log_warning": "warning",
+    "log_debug": "debug",
+}
+
+
+def __getattr__(name: str):
+    method = _LOG_NAMES.get(name)
+    if method is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    bound = getattr(get_logger(), method)
+    globals()[name] = bound
+    return bound
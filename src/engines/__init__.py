@@ -4,6 +4,21 @@ Execution Engines - 工作流执行引擎
 提供不同的工作流执行引擎实现。
 """
 
-from .langgraph_engine import LangGraphEngine
+import importlib
+
+# 引擎在首次访问时才导入（LangGraphEngine 会连带导入 langgraph），
+# 导入后写回模块全局，之后的访问不再经过 __getattr__
+_LAZY_IMPORTS = {
+    "LangGraphEngine": ".langgraph_engine",
+}
 
 __all__ = ["LangGraphEngine"]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -4,20 +4,165 @@ LangGraph执行引擎 - 基于LangGraph的工作流编排引擎
 替代原有的StateMachineEngine，使用LangGraph提供的图结构和流式执行能力。
 """
 
+import os
+import re
+import asyncio
+import json
 import time
+import hashlib
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Callable
-from pathlib import Path
 
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 
 from ..core.workflow_state import WorkflowState, create_initial_state, extract_agent_context
 from ..services.evaluators.condition_evaluator import UnifiedConditionEvaluator
+from ..services.environment_service import CollabReader
 from ..diagnostics.logging import get_logger
+from ..diagnostics.exceptions import AgentError
 from ..workflows.guide import COLLABORATION_GUIDE
 from ..decorators.error_handlers import langgraph_node_error_handler, langgraph_execution_handler
 
 
+# JSON解码器（复用同一实例，raw_decode 直接在原字符串上按偏移解析）
+_DECODER = json.JSONDecoder()
+
+# 条件语法：{% if last_agent_name == "supplier" %}...{% else %}...{% endif %}
+_CONDITIONAL_RE = re.compile(
+    r'\{%\s*if\s+last_agent_name\s*==\s*["\'](\w+)["\']\s*%\}(.*?)\{%\s*else\s*%\}(.*?)\{%\s*endif\s*%\}',
+    re.DOTALL
+)
+
+# 支持的模板变量
+# 注意：{{turn_count}} 模板变量已废弃，应该使用细粒度 turn_count
+# 为了向后兼容，暂时保留，但建议使用具体的 turn_count_{agent}_{state}
+_VARIABLE_RE = re.compile(
+    r'\{\{(initial_message|turn_count|COLLABORATION_GUIDE|'
+    r'last_agent_name|last_agent_content|last_agent_decisions)\}\}'
+)
+
+
+class _PromptPlan:
+    """
+    预编译的prompt模板
+
+    模板在构建时按条件块切分，每段再按变量切分为 [文本, 变量名, 文本, ...]，
+    渲染时只需选择条件分支并一次拼接。
+    """
+
+    __slots__ = ("parts", "keys")
+
+    def __init__(self, template: str):
+        # parts: [(条件值或None, if分段, else分段)]
+        self.parts = []
+        pos = 0
+        for match in _CONDITIONAL_RE.finditer(template):
+            self.parts.append((None, _VARIABLE_RE.split(template[pos:match.start()]), None))
+            self.parts.append((
+                match.group(1),
+                _VARIABLE_RE.split(match.group(2)),
+                _VARIABLE_RE.split(match.group(3))
+            ))
+            pos = match.end()
+        self.parts.append((None, _VARIABLE_RE.split(template[pos:]), None))
+
+        # 模板中实际出现的变量名，渲染时只计算这些变量
+        self.keys = frozenset(
+            segment
+            for _, if_segments, else_segments in self.parts
+            for segments in (if_segments, else_segments or ())
+            for segment in segments[1::2]
+        )
+
+    def render(self, values: Dict[str, str], last_agent_name: str) -> str:
+        out = []
+        for condition_value, if_segments, else_segments in self.parts:
+            if condition_value is None or last_agent_name == condition_value:
+                segments = if_segments
+            else:
+                segments = else_segments
+            for i, segment in enumerate(segments):
+                # 奇数位为变量名
+                out.append(values[segment] if i & 1 else segment)
+        return "".join(out)
+
+
+@lru_cache(maxsize=128)
+def _compile_prompt(template: str) -> _PromptPlan:
+    """编译prompt模板（相同模板文本只解析一次，多个状态/引擎共用）"""
+    return _PromptPlan(template)
+
+
+# 协作规范（去除首尾空白后的文本，只计算一次）
+_GUIDE_STRIPPED = COLLABORATION_GUIDE.strip()
+
+# 获取Agent时使用的简化上下文（只需要 workflow_name 和 metadata）
+_AgentContext = namedtuple("_AgentContext", ["workflow_name", "metadata"])
+
+# 编译后的图缓存 {配置签名: CompiledGraph}，按最近使用保留 _COMPILED_GRAPH_CACHE_SIZE 个
+# 图中的节点/路由函数只依赖配置，运行时通过 config["configurable"]["engine"] 取得引擎，
+# 因此相同配置的多个引擎可以共用同一个编译结果
+_COMPILED_GRAPH_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_COMPILED_GRAPH_CACHE_SIZE = 16
+
+
+def _collab_dir_of(workspace_info: Any) -> Any:
+    """取出工作区的collab目录（workspace_info 可以是 WorkspaceInfo 或字典）"""
+    if not workspace_info:
+        return None
+    if isinstance(workspace_info, dict):
+        return workspace_info.get("collab_dir")
+    return getattr(workspace_info, "collab_dir", None)
+
+
+def _config_signature(config: Dict[str, Any]) -> str:
+    """计算workflow配置的签名（键排序后的JSON摘要）"""
+    payload = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _create_agent_node(state_config: Dict[str, Any]) -> Callable:
+    """
+    创建Agent执行节点
+
+    Args:
+        state_config: 状态配置
+
+    Returns:
+        节点执行函数
+    """
+    # 模板只解析一次，之后每轮直接渲染
+    prompt_plan = _compile_prompt(state_config.get("prompt", ""))
+
+    def agent_node(state: WorkflowState, config: RunnableConfig) -> Dict[str, Any]:
+        """Agent节点执行函数"""
+        engine = config["configurable"]["engine"]
+        return engine._execute_agent_logic(state, state_config, prompt_plan)
+
+    return agent_node
+
+
+def _create_router_function(state_name: str) -> Callable:
+    """
+    创建LangGraph路由函数
+
+    Args:
+        state_name: 转移所属的状态名称
+
+    Returns:
+        路由函数
+    """
+    def router(state: WorkflowState, config: RunnableConfig) -> str:
+        """路由函数：交给当前引擎根据条件决定下一个状态"""
+        return config["configurable"]["engine"]._route(state_name, state)
+
+    return router
+
+
 class LangGraphEngine:
     """
     LangGraph工作流执行引擎
@@ -55,16 +200,88 @@ class LangGraphEngine:
         self.states = config.get("states", [])
         self.exit_conditions = config.get("exit_conditions", [])
         self.max_turns = config.get("max_turns", 10)
+        # 状态中 messages/agent_responses 只保留最近若干轮，避免长流程状态无限增长
+        self.history_limit = config.get("history_limit", self.max_turns)
+        # 是否保留所有轮次的完整响应；默认只保留最近一轮（渲染下一轮prompt所需），执行历史只记录决策
+        self.keep_full_responses = config.get("keep_full_responses", False)
+        
+        # 本次执行已获取的Agent {(agent_name, workflow_name, collab_dir): agent}，每次执行开始时清空
+        self._agent_cache: Dict[tuple, Any] = {}
+        
+        # collab目录读取器（未变化的文件复用上次读取的内容）
+        self._collab_reader = CollabReader()
+        
+        # 一次遍历构建状态映射、起始状态、各状态的转移和路径映射
+        self._index_states()
+        
+        # 预编译全局退出条件
+        # max_turns_exceeded 在评估器的上限不低于引擎上限时，已被 _check_global_exit_conditions
+        # 开头的 total_turns 检查覆盖，无需再逐轮评估
+        max_turns_checked = getattr(condition_evaluator, "max_turns", None) is not None and condition_evaluator.max_turns >= self.max_turns
+        self._exit_condition_exprs = [
+            exit_condition.get("condition", "")
+            for exit_condition in self.exit_conditions
+            if exit_condition.get("condition", "")
+            and not (max_turns_checked and exit_condition.get("condition", "").strip() == "max_turns_exceeded")
+        ]
+        self._exit_predicates = [condition_evaluator.compile(condition) for condition in self._exit_condition_exprs]
+        
+        # 构建LangGraph（编译结果按配置共享，这里绑定当前引擎供节点/路由使用）
+        self.graph = self._build_graph().with_config(configurable={"engine": self})
+    
+    def _index_states(self) -> None:
+        """一次遍历states，构建 state_map / 起始状态 / 转移 / 路径映射"""
+        self.state_map: Dict[str, Dict[str, Any]] = {}
+        self._transitions_by_state: Dict[str, tuple] = {}
+        self._compiled_transitions: Dict[str, tuple] = {}
+        self._path_maps: Dict[str, Dict[str, str]] = {}
+        self._start_state: Optional[str] = None
         
-        # 构建状态映射
-        self.state_map = {state["name"]: state for state in self.states}
+        for state_config in self.states:
+            state_name = state_config["name"]
+            self.state_map[state_name] = state_config
+            if self._start_state is None and state_config.get("start", False):
+                self._start_state = state_name
+            
+            transitions = tuple(state_config.get("transitions") or ())
+            self._transitions_by_state[state_name] = transitions
+            if transitions:
+                self._path_maps[state_name] = self._create_path_map(transitions)
+                # 转移条件预编译，路由时只做函数调用
+                self._compiled_transitions[state_name] = tuple(
+                    (
+                        transition.get("condition", "true"),
+                        self.condition_evaluator.compile(transition.get("condition", "true")),
+                        transition.get("to", "END")
+                    )
+                    for transition in transitions
+                )
         
-        # 构建LangGraph
-        self.graph = self._build_graph()
+        # 默认第一个状态
+        if self._start_state is None and self.states:
+            self._start_state = self.states[0]["name"]
     
     def _build_graph(self) -> Any:
         """
-        从YAML配置构建LangGraph
+        获取编译后的LangGraph（相同配置只编译一次）
+        
+        Returns:
+            编译后的LangGraph
+        """
+        signature = _config_signature(self.config)
+        graph = _COMPILED_GRAPH_CACHE.get(signature)
+        if graph is None:
+            graph = self._compile_graph()
+            _COMPILED_GRAPH_CACHE[signature] = graph
+            if len(_COMPILED_GRAPH_CACHE) > _COMPILED_GRAPH_CACHE_SIZE:
+                _COMPILED_GRAPH_CACHE.popitem(last=False)
+        else:
+            _COMPILED_GRAPH_CACHE.move_to_end(signature)
+        return graph
+    
+    def _compile_graph(self) -> Any:
+        """
+        从YAML配置构建并编译LangGraph
         
         Returns:
             编译后的LangGraph
@@ -75,29 +292,25 @@ class LangGraphEngine:
         # 1. 添加Agent节点（每个state对应一个节点）
         for state_config in self.states:
             state_name = state_config["name"]
-            node_func = self._create_agent_node(state_config)
+            node_func = _create_agent_node(state_config)
             graph.add_node(state_name, node_func)
         
         # 2. 设置入口点
-        start_state = self._get_start_state()
+        start_state = self._start_state
         if not start_state:
             raise ValueError("No start state found in workflow configuration")
         graph.set_entry_point(start_state)
         
         # 3. 添加条件边（transitions）
-        for state_config in self.states:
-            state_name = state_config["name"]
-            transitions = state_config.get("transitions", [])
-            
+        for state_name, transitions in self._transitions_by_state.items():
             if transitions:
                 # 使用条件路由
-                router_func = self._create_router_function(transitions)
-                path_map = self._create_path_map(transitions)
+                router_func = _create_router_function(state_name)
                 
                 graph.add_conditional_edges(
                     state_name,
                     router_func,
-                    path_map
+                    self._path_maps[state_name]
                 )
             else:
                 # 默认转到END
@@ -107,42 +320,35 @@ class LangGraphEngine:
         return graph.compile()
     
     def _get_start_state(self) -> Optional[str]:
-        """获取起始状态"""
-        for state in self.states:
-            if state.get("start", False):
-                return state["name"]
-        
-        # 默认第一个状态
-        if self.states:
-            return self.states[0]["name"]
-        
-        return None
+        """获取起始状态（标记start的状态，默认第一个状态）"""
+        return self._start_state
     
     @langgraph_node_error_handler
-    def _execute_agent_logic(self, state: WorkflowState, state_config: Dict[str, Any]) -> WorkflowState:
-        """执行Agent逻辑（被装饰器保护）"""
+    def _execute_agent_logic(
+        self,
+        state: WorkflowState,
+        state_config: Dict[str, Any],
+        prompt_plan: Optional[_PromptPlan] = None
+    ) -> Dict[str, Any]:
+        """执行Agent逻辑（被装饰器保护），返回本轮的状态增量"""
         agent_name = state_config["agent"]
         state_name = state_config["name"]
-        prompt_template = state_config.get("prompt", "")
 
         # 1. 渲染prompt
-        prompt = self._render_prompt(prompt_template, state)
-        
-        # 2. 获取Agent实例
-        from ..core.workflow_base import WorkflowContext
-        
-        # 从state构建context（简化版）
-        context = type('obj', (object,), {
-            'workflow_name': state["workflow_name"],
-            'metadata': {
-                'workspace_info': state["workspace_info"]
-            }
-        })()
-        
-        agent = self.agent_service.get_agent_for_workflow(agent_name, context)
+        prompt = self._render_prompt(prompt_plan or state_config.get("prompt", ""), state)
+        
+        # 2. 获取Agent实例（同一次执行中按 (agent, workflow, 工作区) 复用）
+        workflow_name = state["workflow_name"]
+        cache_key = (agent_name, workflow_name, str(_collab_dir_of(state.get("workspace_info"))))
+        agent = self._agent_cache.get(cache_key)
+        if agent is None:
+            # 从state构建context（简化版）
+            context = _AgentContext(workflow_name, {"workspace_info": state["workspace_info"]})
+            agent = self.agent_service.get_agent_for_workflow(agent_name, context)
+            self._agent_cache[cache_key] = agent
         
         # 3. 执行Agent (Aider 原生 run)
-        self.logger.info(f"🤖 Executing {agent_name} in state '{state_name}'")
+        self.logger.info("🤖 Executing %s in state '%s'", agent_name, state_name)
         
         # Aider 的 run 方法内部已经包含了 "生成 -> 应用 -> 报错 -> 重试" 的原生循环
         response = agent.run(prompt)
@@ -158,129 +364,99 @@ class LangGraphEngine:
 
         # 5. ✅ 通用事实核查 (Generic Fact Check)
         # 只要 Agent 的 aider_edited_files 集合不为空，说明它真的干活了（修改了磁盘上的文件）
-        has_edited_files = False
-        if hasattr(agent, "aider_edited_files") and agent.aider_edited_files:
-            has_edited_files = True
-            self.logger.info(f"✅ Verified edits on files: {agent.aider_edited_files}")
+        edited_files = getattr(agent, "aider_edited_files", None)
+        has_edited_files = bool(edited_files)
+        if has_edited_files:
+            self.logger.info("✅ Verified edits on files: %s", edited_files)
 
         # 兜底逻辑：如果解析不到 JSON，但检测到文件修改，我们可以尝试给一个默认成功的信号
         # 或者仅仅是打印日志，把判断权留给具体的决策字段
         # (这里为了通用性，我们不强行修改具体的 key，除非 workflow 约定了通用 key)
-        if has_edited_files and not parsed_response["decisions"]:
+        decisions = parsed_response.get("decisions", {})
+        if has_edited_files and not decisions:
             self.logger.warning("⚠️ Files edited but no JSON decisions found. Agent might have forgotten to report status.")
             # 可选：如果您的 workflow 设计中所有 completion key 都叫 'task_complete'，可以在这里兜底
             # parsed_response["decisions"]["task_complete"] = True
         
-        # 5.1 更新状态中的决策和最后执行的Agent信息
-        state["decisions"] = parsed_response.get("decisions", {})
-        state["last_agent"] = agent_name
-        state["last_content"] = parsed_response.get("content", response)
-        
-        # 5.2 更新总交互次数（系统内部）
-        state["total_turns"] = state.get("total_turns", 0) + 1
+        # 5.1 总交互次数（系统内部，create_initial_state 中初始化为0）
+        total_turns = state["total_turns"] + 1
         
-        # 6. 记录执行历史
-        state["execution_history"].append({
+        # 6. 执行历史只记录精简信息
+        record = {
             "state": state_name,
             "agent": agent_name,
-            "decisions": state["decisions"],
-            "total_turns": state["total_turns"]
-        })
-        
-        # 7. 记录完整响应（可选）
-        if "agent_responses" not in state or state["agent_responses"] is None:
-            state["agent_responses"] = []
-        
-        state["agent_responses"].append({
-            "state": state_name,
-            "agent": agent_name,
-            "response": parsed_response,
-            "timestamp": time.time()
-        })
+            "decisions": decisions,
+            "total_turns": total_turns
+        }
         
-        # 8. 添加消息到历史
-        state["messages"].append(HumanMessage(content=prompt))
-        state["messages"].append(AIMessage(content=response))
+        # 7. 完整响应记录；keep_full_responses 时与执行历史共用同一条记录
+        if self.keep_full_responses:
+            record["response"] = parsed_response
+            record["timestamp"] = time.time()
+            response_record = record
+        else:
+            response_record = dict(record, response=parsed_response, timestamp=time.time())
         
-        return state
+        # 只返回本轮变化的字段，列表类字段由 WorkflowState 中的 reducer 追加合并
+        return {
+            "decisions": decisions,
+            "last_agent": agent_name,
+            "last_content": parsed_response.get("content", response),
+            "total_turns": total_turns,
+            "execution_history": [record],
+            "agent_responses": [response_record],
+            # 8. 添加消息到历史
+            "messages": [HumanMessage(content=prompt), AIMessage(content=response)],
+        }
 
-    def _create_agent_node(self, state_config: Dict[str, Any]) -> Callable:
+    def _route(self, state_name: str, state: WorkflowState) -> str:
         """
-        创建Agent执行节点
+        路由：根据条件决定下一个状态
         
         Args:
-            state_config: 状态配置
+            state_name: 当前状态名称
+            state: 当前workflow状态
             
         Returns:
-            节点执行函数
+            下一个状态名称（必须在path_map中）
         """
-        def agent_node(state: WorkflowState) -> WorkflowState:
-            """Agent节点执行函数"""
-            return self._execute_agent_logic(state, state_config)
+        # 提取Agent上下文（与全局退出条件检查共用）
+        context = extract_agent_context(state)
         
-        return agent_node
-    
-    def _create_router_function(self, transitions: List[Dict[str, Any]]) -> Callable:
-        """
-        创建LangGraph路由函数
+        # 优先检查全局退出条件（在评估转移条件之前）
+        if self._check_global_exit_conditions(state, context):
+            self.logger.info("🏁 Global exit condition met, routing to END")
+            return "END"
         
-        Args:
-            transitions: 转移配置列表
-            
-        Returns:
-            路由函数
-        """
-        def router(state: WorkflowState) -> str:
-            """
-            路由函数：根据条件决定下一个状态
-            
-            Args:
-                state: 当前workflow状态
-                
-            Returns:
-                下一个状态名称（必须在path_map中）
-            """
-            # 优先检查全局退出条件（在评估转移条件之前）
-            if self._check_global_exit_conditions(state):
-                self.logger.info("🏁 Global exit condition met, routing to END")
-                return "END"
-            
-            # 检查决策是否为空（防止死循环或无效状态）
-            if not state.get("decisions"):
-                self.logger.warning("🛑 Decisions are empty, routing to END")
-                return "END"
-            
-            # 提取Agent上下文
-            context = extract_agent_context(state)
-            agent_response = context["agent_response"]
-            condition_state = context["condition_state"]
-            system_state = context["system_state"]
-            
-            # 评估每个转移条件
-            for transition in transitions:
-                condition = transition.get("condition", "true")
-                target = transition.get("to", "END")
-                
-                try:
-                    if self.condition_evaluator.evaluate(condition, agent_response, condition_state, system_state):
-                        # 更新细粒度 turn_count（在确定转移目标后）
-                        from_agent = state.get("last_agent", "")
-                        if from_agent and target != "END":
-                            turn_count_key = f"turn_count_{from_agent}_{target}"
-                            state[turn_count_key] = state.get(turn_count_key, 0) + 1
-                            self.logger.debug(f"📊 Updated {turn_count_key} = {state[turn_count_key]}")
-                        
-                        self.logger.info(f"✅ Condition '{condition}' met, transitioning to '{target}'")
-                        return target
-                except Exception as e:
-                    self.logger.warning(f"⚠️  Failed to evaluate condition '{condition}': {e}")
-                    continue
-            
-            # 默认转到END
-            self.logger.info("📍 No condition met, ending workflow")
+        # 检查决策是否为空（防止死循环或无效状态）
+        if not state.get("decisions"):
+            self.logger.warning("🛑 Decisions are empty, routing to END")
             return "END"
         
-        return router
+        agent_response = context["agent_response"]
+        condition_state = context["condition_state"]
+        system_state = context["system_state"]
+        
+        # 评估每个转移条件
+        for condition, predicate, target in self._compiled_transitions[state_name]:
+            try:
+                if predicate(agent_response, condition_state, system_state):
+                    # 更新细粒度 turn_count（在确定转移目标后）
+                    from_agent = state.get("last_agent", "")
+                    if from_agent and target != "END":
+                        turn_count_key = f"turn_count_{from_agent}_{target}"
+                        state[turn_count_key] = state.get(turn_count_key, 0) + 1
+                        self.logger.debug("📊 Updated %s = %s", turn_count_key, state[turn_count_key])
+                    
+                    self.logger.info("✅ Condition '%s' met, transitioning to '%s'", condition, target)
+                    return target
+            except Exception as e:
+                self.logger.warning("⚠️  Failed to evaluate condition '%s': %s", condition, e)
+                continue
+        
+        # 默认转到END
+        self.logger.info("📍 No condition met, ending workflow")
+        return "END"
     
     def _create_path_map(self, transitions: List[Dict[str, Any]]) -> Dict[str, str]:
         """
@@ -302,68 +478,48 @@ class LangGraphEngine:
         
         return path_map
     
-    def _render_prompt(self, template: str, state: WorkflowState) -> str:
+    def _render_prompt(self, template, state: WorkflowState) -> str:
         """
         渲染prompt模板，支持条件语法 {% if %}
-        
+
         Args:
-            template: Prompt模板
+            template: Prompt模板（字符串或预编译的_PromptPlan）
             state: 当前状态
-            
+
         Returns:
             渲染后的prompt
         """
-        import re
-        
-        prompt = template
-        
-        # 基础变量替换
-        prompt = prompt.replace("{{initial_message}}", state.get("initial_message", ""))
-        # 注意：{{turn_count}} 模板变量已废弃，应该使用细粒度 turn_count
-        # 为了向后兼容，暂时保留，但建议使用具体的 turn_count_{agent}_{state}
-        prompt = prompt.replace("{{turn_count}}", str(state.get("total_turns", 0)))
-        
-        # 协作规范替换
-        prompt = prompt.replace("{{COLLABORATION_GUIDE}}", COLLABORATION_GUIDE.strip())
-        
-        # 传递上一轮的增量信息
+        plan = template if isinstance(template, _PromptPlan) else _compile_prompt(template)
+
+        keys = plan.keys
+        values = {}
+
+        # 传递上一轮的增量信息（第一轮没有上一轮信息）
         agent_responses = state.get("agent_responses", [])
-        if agent_responses:
-            last_response = agent_responses[-1]
-            last_agent_name = last_response.get("agent", "")
-            last_content = last_response.get("response", {}).get("content", "")
-            last_decisions = last_response.get("response", {}).get("decisions", {})
-            
-            prompt = prompt.replace("{{last_agent_name}}", last_agent_name)
-            prompt = prompt.replace("{{last_agent_content}}", last_content)
-            prompt = prompt.replace("{{last_agent_decisions}}", str(last_decisions))
-        else:
-            # 第一轮，没有上一轮信息
-            prompt = prompt.replace("{{last_agent_name}}", "")
-            prompt = prompt.replace("{{last_agent_content}}", "")
-            prompt = prompt.replace("{{last_agent_decisions}}", "{}")
-            last_agent_name = ""  # 用于条件判断
-        
-        # ✅ 处理条件语法 {% if %}...{% else %}...{% endif %}
-        # 匹配模式：{% if last_agent_name == "supplier" %}...{% else %}...{% endif %}
-        pattern = r'\{%\s*if\s+last_agent_name\s*==\s*["\'](\w+)["\']\s*%\}(.*?)\{%\s*else\s*%\}(.*?)\{%\s*endif\s*%\}'
-        
-        def replace_conditional(match):
-            condition_value = match.group(1)  # "supplier"
-            if_block = match.group(2)  # if 块内容
-            else_block = match.group(3)  # else 块内容
-            
-            # 判断条件是否满足
-            if last_agent_name == condition_value:
-                return if_block  # 使用 if 块
-            else:
-                return else_block  # 使用 else 块
-        
-        # 替换所有条件块
-        prompt = re.sub(pattern, replace_conditional, prompt, flags=re.DOTALL)
-        
-        return prompt
-    
+        last_response = agent_responses[-1] if agent_responses else None
+        last_agent_name = last_response.get("agent", "") if last_response else ""
+
+        if "initial_message" in keys:
+            values["initial_message"] = state.get("initial_message", "")
+        if "turn_count" in keys:
+            values["turn_count"] = str(state.get("total_turns", 0))
+        if "COLLABORATION_GUIDE" in keys:
+            values["COLLABORATION_GUIDE"] = _GUIDE_STRIPPED
+        if "last_agent_name" in keys:
+            values["last_agent_name"] = last_agent_name
+        if "last_agent_content" in keys:
+            values["last_agent_content"] = (
+                last_response.get("response", {}).get("content", "") if last_response else ""
+            )
+        if "last_agent_decisions" in keys:
+            # 决策字典可能较大，只有模板引用时才转字符串
+            values["last_agent_decisions"] = (
+                str(last_response.get("response", {}).get("decisions", {})) if last_response else "{}"
+            )
+
+        # 条件块在模板上选择分支，再一次性完成变量替换
+        return plan.render(values, last_agent_name)
+
     def _parse_agent_response(self, response: str, agent_name: str = "unknown", state_name: str = "unknown") -> Dict[str, Any]:
         """
         解析Agent响应，必须包含JSON格式的decisions字段
@@ -379,27 +535,25 @@ class LangGraphEngine:
         Raises:
             AgentError: 如果响应不包含JSON格式或缺少decisions字段
         """
-        import json
-        from ..diagnostics.exceptions import AgentError
-        
-        # 策略：查找所有 '{' 的位置，从后往前尝试解析 JSON
-        # 这样可以避免正则贪婪匹配的问题，也能处理嵌套结构
-        starts = [i for i, char in enumerate(response) if char == '{']
+        # 策略：从后往前依次尝试每个 '{' 的位置解析 JSON
+        # 这样可以避免正则贪婪匹配的问题，也能处理嵌套结构；raw_decode 按偏移解析，不复制子串
         parsed = None
-        json_str = ""
+        json_start = json_end = 0
         
-        for start in reversed(starts):
+        # 快速路径：响应中没有 "decisions" 键名时不可能解析出目标结构，跳过逐个尝试
+        start = response.rfind('{') if '"decisions"' in response else -1
+        while start >= 0:
             try:
-                # 尝试解析从当前 '{' 开始的字符串
-                obj, end = json.JSONDecoder().raw_decode(response[start:])
+                obj, end = _DECODER.raw_decode(response, start)
                 
                 # 验证是否是我们期望的结构
                 if isinstance(obj, dict) and "decisions" in obj:
                     parsed = obj
-                    json_str = response[start:start+end]
+                    json_start, json_end = start, end
                     break
             except json.JSONDecodeError:
-                continue
+                pass
+            start = response.rfind('{', 0, start)
 
         if not parsed:
             raise AgentError(
@@ -410,7 +564,7 @@ class LangGraphEngine:
         
         # 确保包含content字段（如果没有，使用整个响应）
         if "content" not in parsed:
-            parsed["content"] = response.replace(json_str, "").strip()
+            parsed["content"] = (response[:json_start] + response[json_end:]).strip()
         
         # 如果替换后为空，使用整个响应
         if not parsed["content"]:
@@ -418,27 +572,32 @@ class LangGraphEngine:
 
         return parsed
     
-    def _check_global_exit_conditions(self, state: WorkflowState) -> bool:
-        """检查全局退出条件"""
-        context = extract_agent_context(state)
+    def _check_global_exit_conditions(self, state: WorkflowState, context: Optional[Dict[str, Any]] = None) -> bool:
+        """检查全局退出条件（context 为已提取的Agent上下文，未提供时按需从state提取）"""
+        # 检查 max_turns（系统级退出条件，直接读state，无需提取上下文）
+        total_turns = state.get("total_turns", 0)
+        if total_turns >= self.max_turns:
+            self.logger.info("🏁 Max turns exceeded: %s >= %s", total_turns, self.max_turns)
+            return True
+        
+        if not self._exit_predicates:
+            return False
+        
+        if context is None:
+            context = extract_agent_context(state)
         condition_state = context["condition_state"]
         system_state = context["system_state"]
         
-        # 检查 max_turns（系统级退出条件）
-        if system_state.get("total_turns", 0) >= self.max_turns:
-            self.logger.info(f"🏁 Max turns exceeded: {system_state.get('total_turns')} >= {self.max_turns}")
-            return True
+        # 检查 YAML 中定义的退出条件（批量评估，遇到第一个满足的即停止）
+        def on_error(index: int, e: Exception) -> None:
+            self.logger.warning("⚠️  Failed to evaluate exit condition '%s': %s", self._exit_condition_exprs[index], e)
         
-        # 检查 YAML 中定义的退出条件
-        for exit_condition in self.exit_conditions:
-            condition = exit_condition.get("condition", "")
-            if condition:
-                try:
-                    if self.condition_evaluator.evaluate(condition, {}, condition_state, system_state):
-                        self.logger.info(f"🏁 Global exit condition met: {condition}")
-                        return True
-                except Exception as e:
-                    self.logger.warning(f"⚠️  Failed to evaluate exit condition '{condition}': {e}")
+        index = self.condition_evaluator.evaluate_all(
+            self._exit_predicates, {}, condition_state, system_state, on_error=on_error
+        )
+        if index >= 0:
+            self.logger.info("🏁 Global exit condition met: %s", self._exit_condition_exprs[index])
+            return True
         
         return False
     
@@ -454,23 +613,80 @@ class LangGraphEngine:
         Returns:
             执行结果
         """
+        initial_state, config = self._prepare_run(context, initial_state_data)
+        
+        # 流式执行LangGraph：每步结束后在后台预读collab目录，与下一轮Agent执行重叠，
+        # 结束时 _get_final_content 只需读取最后一步改动的文件
+        final_state = initial_state
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            prefetch = None
+            for final_state in self.graph.stream(initial_state, config=config, stream_mode="values"):
+                prefetch = self._on_step(final_state, prefetcher, prefetch)
+        
+        # 构建结果
+        return self._build_result(final_state)
+    
+    @langgraph_execution_handler
+    async def execute_async(self, context, initial_state_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        异步执行工作流
+        
+        Agent调用是阻塞的，由LangGraph在线程池中执行节点，事件循环本身不被阻塞，
+        因此多个工作流可以在同一个事件循环中并发运行。
+        
+        Args:
+            context: 工作流上下文
+            initial_state_data: 初始状态数据
+            
+        Returns:
+            执行结果
+        """
+        initial_state, config = self._prepare_run(context, initial_state_data)
+        
+        final_state = initial_state
+        async for final_state in self.graph.astream(initial_state, config=config, stream_mode="values"):
+            pass
+        
+        # 读取collab目录是文件I/O，放到线程中执行
+        return await asyncio.to_thread(self._build_result, final_state)
+    
+    def _prepare_run(self, context, initial_state_data: Optional[Dict[str, Any]]) -> tuple:
+        """创建初始状态和LangGraph运行配置"""
+        # 上一次执行获取的Agent可能绑定在其他工作区，不跨执行复用
+        self._agent_cache.clear()
+        
         # 创建初始状态
         initial_state = create_initial_state(
             workflow_name=context.workflow_name,
             initial_message=context.initial_message,
-            workspace_info=initial_state_data.get("workspace_info") if initial_state_data else {}
+            workspace_info=initial_state_data.get("workspace_info") if initial_state_data else {},
+            history_limit=self.history_limit,
+            response_limit=self.history_limit if self.keep_full_responses else 1
         )
         
         # 设置 LangGraph 配置，包括递归限制
         # recursion_limit 应该大于 max_turns，给足够的执行空间
         recursion_limit = self.max_turns * 3
         config = {"recursion_limit": recursion_limit}
+        return initial_state, config
+    
+    def _on_step(self, state: WorkflowState, prefetcher: ThreadPoolExecutor, prefetch: Optional[Future]) -> Optional[Future]:
+        """
+        每个执行步骤结束后的回调：预热collab文件缓存
         
-        # 执行LangGraph
-        final_state = self.graph.invoke(initial_state, config=config)
-        
-        # 构建结果
-        return self._build_result(final_state)
+        Args:
+            state: 当前步骤结束后的完整状态
+            prefetcher: 后台预读线程池
+            prefetch: 上一次提交的预读任务
+            
+        Returns:
+            当前进行中的预读任务
+        """
+        collab_dir = _collab_dir_of(state.get("workspace_info"))
+        # 上一次预读尚未完成时不重复提交
+        if not collab_dir or (prefetch is not None and not prefetch.done()):
+            return prefetch
+        return prefetcher.submit(self._collab_reader.refresh, os.fspath(collab_dir))
     
     def _build_result(self, final_state: WorkflowState) -> Dict[str, Any]:
         """构建执行结果"""
@@ -488,34 +704,17 @@ class LangGraphEngine:
         }
     
     def _get_final_content(self, final_state: WorkflowState) -> str:
-        """获取最终内容 - 从collab目录获取所有文件内容"""
+        """获取最终内容 - 从collab目录获取所有文件内容（未变化的文件复用上次读取的内容）"""
         try:
-            workspace_info = final_state.get("workspace_info", {})
-            if not workspace_info:
-                return ""
-            
-            collab_dir = workspace_info.get("collab_dir")
+            collab_dir = _collab_dir_of(final_state.get("workspace_info"))
             if not collab_dir:
                 return ""
             
-            collab_dir = Path(collab_dir)
-            all_files_content = []
-            
-            # 收集collab目录下所有文件的内容
-            for file_path in collab_dir.rglob("*"):
-                if file_path.is_file() and not file_path.name.startswith('.'):
-                    try:
-                        content = file_path.read_text(encoding='utf-8')
-                        relative_path = file_path.relative_to(collab_dir)
-                        all_files_content.append(f"=== {relative_path} ===\n{content}")
-                    except Exception as e:
-                        all_files_content.append(f"=== {file_path.name} ===\n[无法读取文件: {e}]")
-            
-            return "\n\n".join(all_files_content) if all_files_content else "collab目录为空"
+            return self._collab_reader.read(os.fspath(collab_dir))
         except Exception as e:
             return f"无法读取collab目录内容: {e}"
     
     def _get_agents_used(self, final_state: WorkflowState) -> List[str]:
-        """获取使用的Agent列表"""
+        """获取使用的Agent列表（去重，保持首次出现顺序）"""
         history = final_state.get("execution_history", [])
-        return list(set(item["agent"] for item in history if "agent" in item))
+        return list(dict.fromkeys(item["agent"] for item in history if "agent" in item))
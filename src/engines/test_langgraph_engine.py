@@ -0,0 +1,115 @@
+"""
+LangGraph引擎测试 - 使用真实的 WorkspaceInfo 执行工作流
+"""
+
+import json
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# 添加父目录到路径，以便导入模块
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.workflow_base import WorkflowContext
+from src.engines.langgraph_engine import LangGraphEngine
+from src.services.environment_service import WorkspaceInfo
+from src.services.evaluators.condition_evaluator import UnifiedConditionEvaluator
+
+
+WORKFLOW_CONFIG = {
+    "name": "engine_test",
+    "max_turns": 10,
+    "states": [
+        {
+            "name": "draft",
+            "agent": "writer",
+            "start": True,
+            "prompt": "{{initial_message}}",
+            "transitions": [{"to": "review", "condition": "draft_done"}],
+        },
+        {
+            "name": "review",
+            "agent": "reviewer",
+            "prompt": "{{last_agent_content}}",
+            "transitions": [
+                {"to": "END", "condition": "approved"},
+                {"to": "draft", "condition": "NOT approved"},
+            ],
+        },
+    ],
+    "exit_conditions": [{"condition": "error_occurred", "action": "force_end"}],
+}
+
+
+class _FakeAgent:
+    """按顺序返回预设决策的Agent"""
+
+    def __init__(self, collab_dir: Path, name: str, decisions: list):
+        self.collab_dir = collab_dir
+        self.name = name
+        self.decisions = iter(decisions)
+        self.aider_edited_files = set()
+
+    def run(self, prompt: str) -> str:
+        (self.collab_dir / f"{self.name}.md").write_text(f"{self.name} output", encoding="utf-8")
+        return json.dumps({"decisions": next(self.decisions)})
+
+
+class _FakeAgentService:
+    """记录获取Agent时传入的工作区信息"""
+
+    def __init__(self, collab_dir: Path):
+        self.agents = {
+            "writer": _FakeAgent(collab_dir, "writer", [{"draft_done": True}, {"draft_done": True}]),
+            "reviewer": _FakeAgent(collab_dir, "reviewer", [{"approved": False}, {"approved": True}]),
+        }
+        self.workspaces = []
+
+    def get_agent_for_workflow(self, agent_name, context):
+        self.workspaces.append(context.metadata["workspace_info"])
+        return self.agents[agent_name]
+
+
+class TestLangGraphEngine(unittest.TestCase):
+    """LangGraph引擎测试类"""
+
+    def setUp(self):
+        """创建临时工作区"""
+        self._tmp = tempfile.TemporaryDirectory()
+        base_dir = Path(self._tmp.name)
+        collab_dir = base_dir / "collab"
+        collab_dir.mkdir()
+        self.workspace_info = WorkspaceInfo(
+            base_dir=base_dir,
+            workflow_dir=base_dir,
+            collab_dir=collab_dir,
+            agent_dirs={"writer": base_dir / "writer", "reviewer": base_dir / "reviewer"},
+        )
+        self.agent_service = _FakeAgentService(collab_dir)
+        self.engine = LangGraphEngine(
+            WORKFLOW_CONFIG, self.agent_service, None, UnifiedConditionEvaluator(max_turns=10)
+        )
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_execute_with_workspace_info(self):
+        """测试状态中保存 WorkspaceInfo（ConfigWorkflow 的用法）时完整执行工作流"""
+        context = WorkflowContext(workflow_name="engine_test", config=None, initial_message="写一篇文章")
+        result = self.engine.execute(context, {"workspace_info": self.workspace_info})
+
+        self.assertTrue(result["success"], result["metadata"]["error"])
+        self.assertEqual(result["total_turns"], 4)
+        self.assertEqual(result["agents_used"], ["writer", "reviewer"])
+        self.assertIn("=== reviewer.md ===\nreviewer output", result["final_content"])
+        self.assertIn("=== writer.md ===\nwriter output", result["final_content"])
+
+        # 同一次执行中每个Agent只获取一次，且拿到的是同一个 WorkspaceInfo
+        self.assertEqual(len(self.agent_service.workspaces), 2)
+        for workspace_info in self.agent_service.workspaces:
+            self.assertIs(workspace_info, self.workspace_info)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,8 +10,9 @@ from typing import Optional, Dict, Any
 
 # 导入架构组件
 from .config import AppConfig
-from .services import EnvironmentService, AgentService
+from .services import EnvironmentService, AgentService, get_agent_service
 from .core import WorkflowFactory, WorkflowContext
+from .core.config_workflow import list_workflow_configs
 from .diagnostics.logging import get_logger
 from .decorators.error_handlers import workflow_execution_error_handler
 
@@ -22,12 +23,14 @@ class FastAntsSession:
     保持 Service 和 Agent 在内存中存活，允许连续运行多个工作流
     """
 
-    def __init__(self, auto_cleanup: bool = True):
+    def __init__(self, auto_cleanup: bool = True, share_agent_service: bool = False):
         """
         初始化持久化会话
 
         Args:
             auto_cleanup: 是否在会话结束时自动清理Agent缓存
+            share_agent_service: 是否使用进程内共享的AgentService（见 get_agent_service）。
+                共享时Agent缓存和清理对所有共享的会话生效，默认每个会话独立创建
     """
         # 1. 加载配置
         self.config = AppConfig.load()
@@ -37,7 +40,10 @@ class FastAntsSession:
 
         # 2. 初始化服务 (只初始化一次，这就是 Keep-Alive 的关键)
         self.env_service = EnvironmentService(self.config)
-        self.agent_service = AgentService(self.config)
+        if share_agent_service:
+            self.agent_service = get_agent_service(self.config)
+        else:
+            self.agent_service = AgentService(self.config)
 
         # 3. 跟踪活跃的工作流
         self.active_workflows: set[str] = set()
@@ -184,27 +190,28 @@ def main(workflow_name: str = "collaboration"):
     Args:
         workflow_name: 工作流名称
     """
-    session = FastAntsSession()
+    session = FastAntsSession(share_agent_service=True)
     session.run_workflow(workflow_name)
 
 
 def list_available_workflows() -> None:
-    """列出所有可用的工作流"""
-    from .core import WorkflowFactory
-    from .diagnostics.logging import get_logger
+    """列出所有可用的工作流（配置驱动的工作流只读取索引，不加载配置和router）"""
     logger = get_logger()
 
     logger.info("Available workflows:")
-    workflows = WorkflowFactory.get_available_workflows()
-    if not workflows:
+    config_workflows = list_workflow_configs()
+    registered = WorkflowFactory.get_available_workflows()
+    if not config_workflows and not registered:
         logger.info("  No workflows registered. Ensure workflow YAMLs or Python classes are correctly defined.")
-    for name, cls in workflows.items():
-        logger.info(f"  - {name}: {cls.__name__}")
+    for name, path in config_workflows.items():
+        logger.info(f"  - {name}: {path.name} (config)")
+    for name, cls in registered.items():
+        if name not in config_workflows:
+            logger.info(f"  - {name}: {cls.__name__}")
 
 
 if __name__ == "__main__":
     import sys
-    from pathlib import Path
 
     # 当作为脚本运行时，确保可以导入相对模块
     sys.path.insert(0, str(Path(__file__).parent))
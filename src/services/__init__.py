@@ -2,13 +2,31 @@
 业务服务层
 """
 
-from .environment_service import EnvironmentService, WorkspaceInfo
-from .agent_service import AgentService
-from .evaluators.condition_evaluator import UnifiedConditionEvaluator
+import importlib
+
+# 服务类在首次访问时才导入（AgentService 会连带导入 Agent 工厂等较重的依赖），
+# 导入后写回模块全局，之后的访问不再经过 __getattr__
+_LAZY_IMPORTS = {
+    'EnvironmentService': '.environment_service',
+    'WorkspaceInfo': '.environment_service',
+    'AgentService': '.agent_service',
+    'get_agent_service': '.agent_service',
+    'UnifiedConditionEvaluator': '.evaluators.condition_evaluator',
+}
 
 __all__ = [
     'EnvironmentService',
     'WorkspaceInfo',
     'AgentService',
+    'get_agent_service',
     'UnifiedConditionEvaluator'
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
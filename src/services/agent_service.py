@@ -5,8 +5,15 @@ Agent服务 - 负责Agent的创建和管理
 import os
 import json
 import re
+import subprocess
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+# 可选依赖：orjson 加速JSON解析（其 JSONDecodeError 是 json.JSONDecodeError 的子类）
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 from ..config import AppConfig
 from ..agents import AiderAgentFactory
@@ -16,6 +23,12 @@ from ..decorators.error_handlers import agent_operation_error_handler
 
 logger = get_logger()
 
+# JSON解码器（复用同一实例，raw_decode 直接在原字符串上按偏移解析）
+_DECODER = json.JSONDecoder()
+
+# 兜底匹配：第一个 { 到最后一个 } 之间的内容
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
 
 class AgentService:
     """
@@ -40,8 +53,15 @@ class AgentService:
         )
 
         # ✅ 新增：Agent实例缓存 {cache_key: agent_instance}
-        # cache_key格式: "workflow_name:agent_name:workspace_path"
-        self._active_agents: Dict[str, Any] = {}
+        # cache_key格式: (workflow_name, agent_name, workspace_path)
+        self._active_agents: Dict[Tuple[str, str, str], Any] = {}
+
+        # collab目录扫描缓存 {collab_dir: (((目录路径, mtime_ns), ...), 相对文件路径列表)}
+        # 同一工作流的多个Agent共享一次扫描，目录未增删文件时直接复用
+        self._collab_scan_cache: Dict[Path, tuple] = {}
+
+        # 已准备好目录结构的 (agent_root, collab_dir)，同一进程内不再重复mkdir/检查
+        self._prepared: set = set()
 
     @agent_operation_error_handler
     def get_agent(
@@ -57,9 +77,10 @@ class AgentService:
         """
         cache_key = self._generate_cache_key(agent_name, workspace_info, workflow_name)
 
-        if cache_key in self._active_agents:
+        agent = self._active_agents.get(cache_key)
+        if agent is not None:
             logger.debug(f"♻️  Reusing cached agent: {cache_key}")
-            return self._active_agents[cache_key]
+            return agent
 
         logger.debug(f"🆕 Creating new agent instance: {cache_key} (type: {agent_type})")
 
@@ -85,20 +106,27 @@ class AgentService:
         self._active_agents[cache_key] = agent
         return agent
 
-    def _generate_cache_key(self, agent_name: str, workspace_info: Any, workflow_name: str = None) -> str:
+    def _generate_cache_key(self, agent_name: str, workspace_info: Any, workflow_name: str = None) -> Tuple[str, str, str]:
         """生成Agent缓存键"""
-        workspace_path = str(workspace_info.collab_dir.parent)
-        return f"{workflow_name or 'default'}:{agent_name}:{workspace_path}"
+        return (workflow_name or 'default', agent_name, workspace_info.workspace_path)
 
     def _prepare_directories(self, agent_root: Path, collab_dir: Path) -> None:
         """准备必要的目录结构"""
+        key = (agent_root, collab_dir)
+        if key in self._prepared:
+            return
+
         agent_root.mkdir(parents=True, exist_ok=True)
         collab_dir.mkdir(parents=True, exist_ok=True)
 
         # collab为空时放置占位，确保被索引
-        if not any(collab_dir.iterdir()):
+        with os.scandir(collab_dir) as it:
+            is_empty = next(it, None) is None
+        if is_empty:
             (collab_dir / ".keep").touch(exist_ok=True)
 
+        self._prepared.add(key)
+
    # 修改 _gather_files 方法签名，增加 workflow_name
     def _gather_files(self, agent_root: Path, collab_dir: Path, workflow_name: str = None) -> List[str]:
         """
@@ -108,27 +136,27 @@ class AgentService:
         3. workflow.yaml 中提到的预期文件（动态白名单）
         """
         fnames_set = set() # 使用集合去重
+        agent_root_str = os.fspath(agent_root)
 
         # 1. 收集agent_root下的文件（排除collab，避免重复）
-        for path in agent_root.rglob("*"):
-            if path.is_file():
-                try:
-                    rel = path.relative_to(agent_root)
-                    if "collab" in rel.parts:
-                        continue
-                    fnames_set.add(str(path))
-                except ValueError:
-                    continue
+        # 只收集普通文件（与 Path.is_file 一致，排除失效软链、FIFO、socket等），不进入任何名为collab的目录
+        pending = [agent_root_str]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as it:
+                    for entry in it:
+                        if entry.name == "collab":
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            fnames_set.add(entry.path)
+            except OSError:
+                continue
 
         # 2. 收集collab下的现有文件（通过软链路径）
-        for path in collab_dir.rglob("*"):
-            if path.is_file():
-                try:
-                    relative_path = path.relative_to(collab_dir)
-                    symlink_path = agent_root / "collab" / relative_path
-                    fnames_set.add(str(symlink_path))
-                except ValueError:
-                    continue
+        symlink_prefix = os.path.join(agent_root_str, "collab", "")
+        fnames_set.update(symlink_prefix + relative_path for relative_path in self._scan_collab(collab_dir))
         
         # 3. 🆕 动态扫描 workflow.yaml 中的潜在文件
         if workflow_name:
@@ -138,17 +166,53 @@ class AgentService:
                 # 我们需要将其转换为 agent 视角的绝对路径
                 # 注意：workflow 中提到的 usually 是 "collab/xxx"，而 agent_root 下也有 "collab" 目录
                 
-                # 处理路径拼接: agent_root / "collab/index.html"
-                full_path = agent_root / relative_path
+                # 处理路径拼接: agent_root / "collab/index.html"（纯字符串操作，不构造Path）
+                full_path = os.path.join(agent_root_str, relative_path)
                 
                 # 即使文件不存在，也加入列表，这样 Aider 就知道它可以创建这个文件
-                fnames_set.add(str(full_path))
+                fnames_set.add(full_path)
                 
                 # 顺便确保父目录存在，避免 Aider 写入时报错
-                if not full_path.parent.exists():
-                    full_path.parent.mkdir(parents=True, exist_ok=True)
+                parent = os.path.dirname(full_path)
+                if not os.path.exists(parent):
+                    os.makedirs(parent, exist_ok=True)
+
+        # 排序保证每次传给Aider的文件顺序一致，便于prompt前缀复用
+        return sorted(fnames_set)
+    def _scan_collab(self, collab_dir: Path) -> List[str]:
+        """
+        获取collab目录下所有文件的相对路径（按目录mtime缓存）
+
+        目录的mtime在其中增删文件时变化，因此只需stat各级目录即可判断缓存是否有效
+        """
+        cached = self._collab_scan_cache.get(collab_dir)
+        if cached is not None:
+            dir_mtimes, relative_paths = cached
+            try:
+                if all(os.stat(path).st_mtime_ns == mtime_ns for path, mtime_ns in dir_mtimes):
+                    return relative_paths
+            except OSError:
+                pass
+
+        dir_mtimes = []
+        relative_paths = []
+        pending = [(os.fspath(collab_dir), "")]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                dir_mtimes.append((directory, os.stat(directory).st_mtime_ns))
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append((entry.path, prefix + entry.name + os.sep))
+                        elif entry.is_file():
+                            relative_paths.append(prefix + entry.name)
+            except OSError:
+                continue
+
+        self._collab_scan_cache[collab_dir] = (tuple(dir_mtimes), relative_paths)
+        return relative_paths
 
-        return list(fnames_set)
     def _scan_workflow_for_files(self, workflow_name: str) -> List[str]:
         """
         解析 workflow.yaml，提取所有提到的 collab 文件路径
@@ -170,7 +234,7 @@ class AgentService:
             pattern = r"collab/[\w\-\./]+\.[a-zA-Z0-9]+"
             matches = re.findall(pattern, content)
             
-            unique_files = list(set(matches))
+            unique_files = sorted(set(matches))
             if unique_files:
                 logger.info(f"🔍 Auto-discovered files from YAML: {unique_files}")
             return unique_files
@@ -182,10 +246,13 @@ class AgentService:
     def _ensure_git_initialized(self, root_path: Path, agent_name: str) -> None:
         """确保Git仓库已初始化并配置"""
         if not (root_path / ".git").exists():
-            # 使用 git -C 指定目录，避免切换目录
-            os.system(f"git -C '{root_path}' init > /dev/null 2>&1")
-            os.system(f"git -C '{root_path}' config user.email 'agent@mas-aider.ai'")
-            os.system(f"git -C '{root_path}' config user.name '{agent_name}'")
+            # 直接执行git（不经过shell），通过 cwd 指定目录，避免切换目录
+            for args in (
+                ("git", "init", "-q"),
+                ("git", "config", "user.email", "agent@mas-aider.ai"),
+                ("git", "config", "user.name", agent_name),
+            ):
+                subprocess.run(args, cwd=root_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
             logger.info(f"🔧 Re-initialized Git repo in {root_path}")
 
     @agent_operation_error_handler
@@ -215,35 +282,37 @@ class AgentService:
     @agent_operation_error_handler
     def clear_agents_for_workflow(self, workflow_name: str):
         """清理特定工作流的Agent缓存"""
-        keys_to_remove = [k for k in self._active_agents.keys()
-                         if k.startswith(f"{workflow_name}:")]
+        to_remove = [(k, agent) for k, agent in self._active_agents.items()
+                     if k[0] == workflow_name]
 
-        for key in keys_to_remove:
-            agent = self._active_agents[key]
-            if hasattr(agent, 'cleanup'):
+        for key, agent in to_remove:
+            try:
+                cleanup = agent.cleanup
+            except AttributeError:
+                pass
+            else:
                 # 这里我们保留try-catch，因为cleanup失败不应阻止其他清理
                 # 但我们可以考虑将其封装到另一个方法中，或者接受这里的例外
                 try:
-                    agent.cleanup()
+                    cleanup()
                 except Exception as e:
-                    logger.warning(f"Failed to cleanup agent {key}: {e}")
-            del self._active_agents[key]
+                    logger.warning(f"Failed to cleanup agent {':'.join(key)}: {e}")
+            self._active_agents.pop(key, None)
 
-        if keys_to_remove:
-            logger.info(f"🧹 Cleaned up {len(keys_to_remove)} agents for workflow '{workflow_name}'")
+        if to_remove:
+            logger.info(f"🧹 Cleaned up {len(to_remove)} agents for workflow '{workflow_name}'")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         total_cached = len(self._active_agents)
         workflow_stats = {}
-        for cache_key in self._active_agents.keys():
-            workflow_name = cache_key.split(':')[0]
+        for workflow_name, _, _ in self._active_agents.keys():
             workflow_stats[workflow_name] = workflow_stats.get(workflow_name, 0) + 1
 
         return {
             "total_cached_agents": total_cached,
             "agents_by_workflow": workflow_stats,
-            "cache_keys": list(self._active_agents.keys())
+            "cache_keys": [":".join(cache_key) for cache_key in self._active_agents]
         }
 
     @agent_operation_error_handler
@@ -267,19 +336,28 @@ class AgentService:
 
     def parse_agent_response(self, response: str) -> Dict[str, Any]:
         """解析Agent响应"""
-        # 尝试使用更健壮的方式提取JSON
-        starts = [i for i, char in enumerate(response) if char == '{']
+        # 不含 { 时不可能有JSON，直接返回
+        first_brace = response.find('{')
+        if first_brace == -1:
+            return {
+                "content": response,
+                "decisions": {}
+            }
+
+        # 尝试使用更健壮的方式提取JSON：从最后一个 { 向前逐个尝试解码
         parsed = None
         json_str = ""
         
-        for start in reversed(starts):
+        start = len(response)
+        while start > first_brace:
+            start = response.rfind('{', first_brace, start)
             try:
-                obj, end = json.JSONDecoder().raw_decode(response[start:])
+                obj, end = _DECODER.raw_decode(response, start)
                 # 这里我们放宽条件，只要是字典且包含decisions即可，或者甚至不包含decisions也可以？
                 # 为了保持一致性，我们优先寻找包含decisions的JSON
                 if isinstance(obj, dict) and "decisions" in obj:
                     parsed = obj
-                    json_str = response[start:start+end]
+                    json_str = response[start:end]
                     break
             except json.JSONDecodeError:
                 continue
@@ -292,12 +370,13 @@ class AgentService:
             return parsed
 
         # Fallback: 尝试正则匹配任何JSON
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        json_match = _JSON_RE.search(response, first_brace)
         if json_match:
+            json_str = json_match.group()
             try:
-                parsed = json.loads(json_match.group())
+                parsed = _json_loads(json_str)
                 if "content" not in parsed:
-                    parsed["content"] = response.replace(json_match.group(), "").strip()
+                    parsed["content"] = response.replace(json_str, "").strip()
                 if "decisions" not in parsed:
                     parsed["decisions"] = {}
                 return parsed
@@ -314,6 +393,25 @@ class AgentService:
         return {
             "factory_config": {
                 "model_name": self.config.aider.model,
-                "api_base": self.config.api_base
+                "api_base": self.config.aider.api_base
             }
         }
+
+
+# 进程内共享的AgentService {(model, api_base): AgentService}
+_SERVICES: Dict[Tuple[str, Optional[str]], AgentService] = {}
+
+
+def get_agent_service(config: AppConfig) -> AgentService:
+    """
+    获取AgentService（相同模型和API端点在进程内只创建一次）
+
+    多次运行工作流时复用同一个服务及其Agent缓存，避免重复初始化模型。
+    所有调用方共享同一个Agent缓存，清理工作流时也会清理其他调用方的Agent，
+    因此只用于单次运行入口等显式选择共享的场景；并发的独立会话应各自创建 AgentService。
+    """
+    key = (config.aider.model, config.aider.api_base)
+    service = _SERVICES.get(key)
+    if service is None:
+        service = _SERVICES[key] = AgentService(config)
+    return service
@@ -4,9 +4,12 @@
 
 import os
 import shutil
+import subprocess
 from pathlib import Path
 from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property
 
 from ..config import AppConfig
 from ..decorators.error_handlers import safe_operation
@@ -15,6 +18,114 @@ from ..diagnostics.logging import get_logger
 logger = get_logger()
 
 
+# 需要读取的文件超过该数量时使用线程池并行读取
+_PARALLEL_READ_THRESHOLD = 4
+
+
+def iter_collab_files(root: str, prefix: str = ""):
+    """
+    递归遍历目录中的非隐藏文件（os.scandir，不跟随目录符号链接）
+
+    Yields:
+        (DirEntry, 相对路径)
+    """
+    subdirs = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+            elif entry.is_file() and not entry.name.startswith('.'):
+                yield entry, prefix + entry.name
+    for entry in subdirs:
+        yield from iter_collab_files(entry.path, prefix + entry.name + os.sep)
+
+
+class CollabReader:
+    """
+    collab目录内容读取器
+
+    按 (mtime, 大小) 缓存每个文件的内容，只读取新增或变化的文件；
+    待读文件较多时使用线程池并行读取（I/O期间释放GIL）。
+    """
+
+    def __init__(self):
+        # {路径: (mtime_ns, size, 内容) 或 读取异常}
+        self._cache: Dict[str, Any] = {}
+        # 上次拼接的结果 {collab_dir: (文件签名, 拼接结果)}
+        self._content_cache: Dict[str, tuple] = {}
+
+    def refresh(self, collab_dir: str) -> List[tuple]:
+        """
+        遍历collab目录并更新文件内容缓存
+
+        Returns:
+            [(DirEntry, 相对路径)]，按遍历顺序
+        """
+        files = list(iter_collab_files(collab_dir))
+
+        pending = [entry for entry, _ in files if not self._is_valid(entry)]
+        if len(pending) > _PARALLEL_READ_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(16, len(pending))) as executor:
+                list(executor.map(self._read, pending))
+        else:
+            for entry in pending:
+                self._read(entry)
+        return files
+
+    def read(self, collab_dir: str) -> str:
+        """读取collab目录下所有文件，拼接为 "=== 相对路径 ===\n内容" 分段"""
+        files = self.refresh(collab_dir)
+
+        # 文件集合及各文件的 (mtime, 大小) 均未变化时直接复用上次的拼接结果
+        signature = []
+        for entry, relative_path in files:
+            cached = self._cache.get(entry.path)
+            if not isinstance(cached, tuple):
+                # 有读取失败的文件时不复用，下次重新尝试读取
+                signature = None
+                break
+            signature.append((relative_path, cached[0], cached[1]))
+        if signature is not None:
+            signature = tuple(signature)
+            previous = self._content_cache.get(collab_dir)
+            if previous is not None and previous[0] == signature:
+                return previous[1]
+
+        all_files_content = []
+        for entry, relative_path in files:
+            cached = self._cache.get(entry.path)
+            if isinstance(cached, tuple):
+                all_files_content.append(f"=== {relative_path} ===\n{cached[2]}")
+            else:
+                all_files_content.append(f"=== {relative_path} ===\n[无法读取文件: {cached}]")
+
+        content = "\n\n".join(all_files_content) if all_files_content else "collab目录为空"
+        if signature is not None:
+            self._content_cache[collab_dir] = (signature, content)
+        return content
+
+    def _is_valid(self, entry: os.DirEntry) -> bool:
+        """缓存内容是否仍然有效（mtime和大小均未变化）"""
+        cached = self._cache.get(entry.path)
+        if not isinstance(cached, tuple):
+            return False
+        try:
+            st = entry.stat()
+        except OSError:
+            return False
+        return cached[0] == st.st_mtime_ns and cached[1] == st.st_size
+
+    def _read(self, entry: os.DirEntry) -> None:
+        """读取文件并写入缓存；读取失败时缓存异常，供拼接时输出错误信息"""
+        try:
+            st = entry.stat()
+            with open(entry.path, encoding='utf-8') as f:
+                content = f.read()
+            self._cache[entry.path] = (st.st_mtime_ns, st.st_size, content)
+        except Exception as e:
+            self._cache[entry.path] = e
+
+
 @dataclass
 class WorkspaceInfo:
     """工作区信息"""
@@ -23,6 +134,11 @@ class WorkspaceInfo:
     collab_dir: Path
     agent_dirs: Dict[str, Path]  # 动态agent目录
 
+    @cached_property
+    def workspace_path(self) -> str:
+        """工作区路径字符串（collab目录的父目录），首次访问后缓存"""
+        return str(self.collab_dir.parent)
+
     def get_agent_paths(self) -> Dict[str, Path]:
         """获取所有Agent路径"""
         return self.agent_dirs.copy()
@@ -42,6 +158,7 @@ class EnvironmentService:
     def __init__(self, config: AppConfig):
         self.config = config
         self._workspace_info: WorkspaceInfo = None
+        self._collab_reader = CollabReader()
         self.logger = logger  # For safe_operation decorator
 
     def setup_workspace_for_workflow(
@@ -96,21 +213,7 @@ class EnvironmentService:
     def get_collab_content(self) -> str:
         """获取collab目录的所有内容"""
         workspace_info = self.get_workspace_info()
-        collab_dir = workspace_info.collab_dir
-        all_files_content = []
-
-        # 收集collab目录下所有文件的内容
-        for file_path in collab_dir.rglob("*"):
-            if file_path.is_file() and not file_path.name.startswith('.'):  # 跳过隐藏文件
-                try:
-                    content = file_path.read_text(encoding='utf-8')
-                    relative_path = file_path.relative_to(collab_dir)
-                    all_files_content.append(f"=== {relative_path} ===\n{content}")
-                except Exception as e:
-                    relative_path = file_path.relative_to(collab_dir)
-                    all_files_content.append(f"=== {relative_path} ===\n[无法读取文件: {e}]")
-
-        return "\n\n".join(all_files_content) if all_files_content else "collab目录为空"
+        return self._collab_reader.read(os.fspath(workspace_info.collab_dir))
 
     def _ensure_workflow_directory(self, paths: Dict[str, Path]) -> None:
         """确保工作流目录存在（持久化，不清理现有内容）"""
@@ -132,37 +235,60 @@ class EnvironmentService:
                 print(f"📁 Created directory: {directory}")
         # collab 目录占位，避免空目录被跳过
         collab_dir = paths["collab_dir"]
-        if collab_dir.exists() and not any(collab_dir.iterdir()):
-            (collab_dir / ".keep").touch(exist_ok=True)
+        if collab_dir.exists():
+            with os.scandir(collab_dir) as it:
+                is_empty = next(it, None) is None
+            if is_empty:
+                (collab_dir / ".keep").touch(exist_ok=True)
 
     def _init_git_repos(self, paths: Dict[str, Path], agent_names: List[str]) -> None:
         """初始化Git仓库"""
         agent_dirs = [paths[f"agent_{name}_dir"] for name in agent_names]
 
-        for agent_dir in agent_dirs:
-            if not (agent_dir / ".git").exists():
-                self._init_single_git_repo(agent_dir)
+        to_init = [agent_dir for agent_dir in agent_dirs if not (agent_dir / ".git").exists()]
+        if to_init:
+            self._init_git_repos_parallel(to_init)
 
     @safe_operation(log_error=True)
-    def _init_single_git_repo(self, agent_dir: Path) -> None:
-        """初始化单个Git仓库"""
-        os.system(f"git init '{agent_dir}' > /dev/null 2>&1")
-        # 配置git用户，防止commit失败
-        os.system(f"cd '{agent_dir}' && git config user.email 'agent@mas-aider.ai'")
-        os.system(f"cd '{agent_dir}' && git config user.name 'MasAider Agent'")
-        print(f"🔧 Initialized Git repo: {agent_dir}")
+    def _init_git_repos_parallel(self, agent_dirs: List[Path]) -> None:
+        """并行初始化多个Git仓库（直接执行git，不经过shell）"""
+        # 按步骤分批：同一步骤在各目录并行执行；同一仓库的config需在init之后且不能并发写
+        steps = (
+            ("init", "-q"),
+            # 配置git用户，防止commit失败
+            ("config", "user.email", "agent@mas-aider.ai"),
+            ("config", "user.name", "MasAider Agent"),
+        )
+        for step in steps:
+            procs = [
+                subprocess.Popen(
+                    ["git", "-C", str(agent_dir), *step],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+                for agent_dir in agent_dirs
+            ]
+            for proc in procs:
+                proc.wait()
+
+        for agent_dir in agent_dirs:
+            print(f"🔧 Initialized Git repo: {agent_dir}")
 
     def _create_symlinks(self, paths: Dict[str, Path], agent_names: List[str]) -> None:
         """创建软链接到collab目录"""
         collab_dir = paths["collab_dir"]
         agent_dirs = [paths[f"agent_{name}_dir"] for name in agent_names]
 
+        # collab目录的真实路径只解析一次，所有Agent的软链共用
+        collab_target = collab_dir.resolve()
         for agent_dir in agent_dirs:
-            self._create_single_symlink(agent_dir, collab_dir)
+            self._create_single_symlink(agent_dir, collab_dir, collab_target)
 
     @safe_operation(log_error=True)
-    def _create_single_symlink(self, agent_dir: Path, collab_dir: Path) -> None:
+    def _create_single_symlink(self, agent_dir: Path, collab_dir: Path, collab_target: Path = None) -> None:
         """创建单个软链接"""
+        if collab_target is None:
+            collab_target = collab_dir.resolve()
         symlink_path = agent_dir / self.config.environment.collab.folder_name
         if symlink_path.exists() or symlink_path.is_symlink():
             if symlink_path.is_dir() and not symlink_path.is_symlink():
@@ -170,10 +296,10 @@ class EnvironmentService:
             else:
                 symlink_path.unlink()
 
-        symlink_path.symlink_to(collab_dir.resolve(), target_is_directory=True)
+        symlink_path.symlink_to(collab_target, target_is_directory=True)
         print(f"🔗 Created symlink: {symlink_path} -> {collab_dir}")
 
         # 校验软链指向
-        if symlink_path.resolve() != collab_dir.resolve():
+        if symlink_path.resolve() != collab_target:
             print(f"⚠️  Symlink points to wrong target: {symlink_path} -> {symlink_path.resolve()}")
 
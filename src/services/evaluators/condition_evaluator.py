@@ -35,6 +35,44 @@ ALLOWED_OPERATORS = {
 }
 
 
+# 单个变量名条件（如 "design_confirmed"），可以跳过AST直接查表
+_IDENTIFIER_RE = re.compile(r'[A-Za-z_]\w*')
+
+# 逻辑运算符关键字（不区分大小写），一次扫描完成 NOT/AND/OR 的规范化
+_LOGICAL_OP_RE = re.compile(r'\b(?:NOT|AND|OR)\b', re.IGNORECASE)
+
+# 旧版状态表达式（如 "turn_count_x >= 5"）：变量名、比较运算符、比较值
+_STATE_EXPR_RE = re.compile(r'(\w+)\s*(==|!=|>=|<=|=|>|<)\s*(?![<>=!])(.+)')
+
+_STATE_EXPR_OPS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+# 不能按变量名处理的标识符（规范化后会变成运算符或字面量）
+_RESERVED_NAMES = frozenset(("not", "and", "or", "true", "false", "none"))
+
+
+def _decision_value(value: Any) -> Any:
+    """将decisions中的值转换为条件变量值（布尔/数值原样，布尔字符串转布尔）"""
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        # 字符串转布尔："true"/"True" -> True, "false"/"False" -> False
+        lowered = value.lower()
+        if lowered in ("true", "1", "yes"):
+            return True
+        if lowered in ("false", "0", "no"):
+            return False
+        return value  # 保留字符串值
+    return bool(value)  # 其他类型转布尔
+
+
 class UnifiedConditionEvaluator:
     """
     统一条件评估引擎 - 使用 AST 解析表达式
@@ -78,6 +116,13 @@ class UnifiedConditionEvaluator:
             "max_turns_exceeded": lambda agent_response, state: False,  # 暂时禁用，需要从 system_state 获取
             "error_occurred": lambda agent_response, state: state.get("error") is not None,
         }
+        
+        # 已编译的条件 {条件表达式: 判定函数}，同一条件只解析一次
+        # 判定函数只依赖表达式本身和 max_turns/workflow_router，不缓存任何评估结果，
+        # 因此可以在多次工作流执行之间安全复用
+        self._compiled: Dict[str, Callable[..., bool]] = {}
+        # 旧版状态表达式的解析结果 {表达式: (变量名, 比较函数, 比较值) 或 None}
+        self._state_expr_plans: Dict[str, Optional[tuple]] = {}
     
     def evaluate(self, condition_expr: str, agent_response: Dict[str, Any], condition_state: Dict[str, Any] = None, system_state: Dict[str, Any] = None) -> bool:
         """
@@ -92,47 +137,157 @@ class UnifiedConditionEvaluator:
         Returns:
             bool: 条件是否满足
         """
+        # 条件只在首次出现时分类和解析，之后直接调用缓存的判定函数
+        return self.compile(condition_expr)(agent_response, condition_state, system_state)
+    
+    def compile(self, condition_expr: str) -> Callable[..., bool]:
+        """
+        预编译条件表达式，返回与 evaluate 语义一致的判定函数
+
+        表达式的分类、规范化和AST解析只在编译时做一次，
+        返回的函数签名为 (agent_response, condition_state=None, system_state=None) -> bool。
+
+        Args:
+            condition_expr: 条件表达式
+
+        Returns:
+            Callable: 判定函数
+        """
+        predicate = self._compiled.get(condition_expr)
+        if predicate is None:
+            predicate = self._compiled[condition_expr] = self._compile(condition_expr)
+        return predicate
+
+    def _compile(self, condition_expr: str) -> Callable[..., bool]:
+        """编译条件表达式（不经过缓存）"""
         if not condition_expr or condition_expr.strip() == "":
-            return True
-        
+            return lambda agent_response, condition_state=None, system_state=None: True
+
         condition_expr = condition_expr.strip()
-        condition_state = condition_state or {}
-        system_state = system_state or {}
-        
-        # 1. 系统预定义条件（最高优先级）
+
+        # 1. 系统预定义条件
+        if condition_expr == "max_turns_exceeded":
+            def predicate(agent_response, condition_state=None, system_state=None):
+                return (system_state or {}).get("total_turns", 0) >= self.max_turns
+            return predicate
+        if condition_expr == "error_occurred":
+            def predicate(agent_response, condition_state=None, system_state=None):
+                return (system_state or {}).get("error") is not None
+            return predicate
         if condition_expr in self.system_conditions:
-            # max_turns_exceeded 和 error_occurred 需要从 system_state 获取
-            if condition_expr == "max_turns_exceeded":
-                total_turns = system_state.get("total_turns", 0)
-                return total_turns >= self.max_turns
-            elif condition_expr == "error_occurred":
-                return system_state.get("error") is not None
-            else:
-                # 其他系统条件（true, false, always, never）
-                return self.system_conditions[condition_expr](agent_response, condition_state)
-        
-        # 2. Workflow特定条件（通过router注入，在AST解析之前检查）
+            system_condition = self.system_conditions[condition_expr]
+
+            def predicate(agent_response, condition_state=None, system_state=None):
+                return system_condition(agent_response, condition_state or {})
+            return predicate
+
+        # 3. AST表达式（解析失败时 body 为 None，每次回退到旧逻辑）
+        try:
+            body = ast.parse(self._normalize_expression(condition_expr), mode='eval').body
+        except Exception:
+            body = None
+
+        def evaluate_ast(agent_response, condition_state, system_state, variables=None):
+            if variables is None:
+                variables = self._build_variable_lookup(agent_response, condition_state)
+            if body is not None:
+                try:
+                    return self._eval_node(body, variables)
+                except Exception:
+                    pass
+            print(f"Warning: AST evaluation failed for '{condition_expr}': Invalid expression: {condition_expr}, falling back to legacy evaluation")
+            return self._legacy_evaluate(condition_expr, agent_response, condition_state)
+
+        # 2. Workflow特定条件（失败时继续走AST解析）
         if self.workflow_router and self.workflow_router.has_condition(condition_expr):
+            router = self.workflow_router
+
+            def predicate(agent_response, condition_state=None, system_state=None):
+                condition_state = condition_state or {}
+                system_state = system_state or {}
+                try:
+                    return router.evaluate_condition(
+                        condition_expr, agent_response, condition_state, system_state
+                    )
+                except Exception as e:
+                    print(f"Warning: Failed to evaluate workflow condition '{condition_expr}': {e}")
+                return evaluate_ast(agent_response, condition_state, system_state)
+            return predicate
+
+        # 单个变量名：直接查 decisions / condition_state，不构建完整的变量查找表
+        if _IDENTIFIER_RE.fullmatch(condition_expr) and condition_expr.lower() not in _RESERVED_NAMES:
+            name = condition_expr
+
+            def predicate(agent_response, condition_state=None, system_state=None):
+                decisions = agent_response.get("decisions", {})
+                if name in decisions:
+                    return _decision_value(decisions[name])
+                condition_state = condition_state or {}
+                if name in condition_state:
+                    value = condition_state[name]
+                    return value if isinstance(value, (bool, int, float, str)) else bool(value)
+                # 未定义的变量与AST路径一致：回退到旧逻辑
+                return evaluate_ast(agent_response, condition_state, system_state or {}, {})
+
+            def eval_with_variables(agent_response, condition_state, system_state, variables=None):
+                if variables is not None and name in variables:
+                    return variables[name]
+                return predicate(agent_response, condition_state, system_state)
+
+            predicate.eval_with_variables = eval_with_variables
+            return predicate
+
+        def predicate(agent_response, condition_state=None, system_state=None):
+            return evaluate_ast(agent_response, condition_state or {}, system_state or {})
+        # 供 evaluate_all 复用同一批条件共享的变量查找表
+        predicate.eval_with_variables = evaluate_ast
+        return predicate
+
+    def evaluate_all(
+        self,
+        predicates,
+        agent_response: Dict[str, Any],
+        condition_state: Dict[str, Any] = None,
+        system_state: Dict[str, Any] = None,
+        on_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> int:
+        """
+        批量评估预编译条件（短路：遇到第一个满足的条件即返回）
+
+        同一批AST条件共享一次变量查找表的构建。
+
+        Args:
+            predicates: compile() 返回的判定函数列表
+            agent_response: Agent的完整响应（包含decisions）
+            condition_state: 条件状态
+            system_state: 系统内部状态
+            on_error: 单个条件评估异常时的回调 (下标, 异常)；为None时直接抛出
+
+        Returns:
+            int: 第一个满足的条件下标，都不满足时返回 -1
+        """
+        condition_state = condition_state or {}
+        system_state = system_state or {}
+        variables = None
+
+        for i, predicate in enumerate(predicates):
             try:
-                return self.workflow_router.evaluate_condition(
-                    condition_expr, agent_response, condition_state, system_state
-                )
+                eval_with_variables = getattr(predicate, "eval_with_variables", None)
+                if eval_with_variables is not None:
+                    if variables is None:
+                        variables = self._build_variable_lookup(agent_response, condition_state)
+                    result = eval_with_variables(agent_response, condition_state, system_state, variables)
+                else:
+                    result = predicate(agent_response, condition_state, system_state)
+                if result:
+                    return i
             except Exception as e:
-                print(f"Warning: Failed to evaluate workflow condition '{condition_expr}': {e}")
-                # 继续尝试AST解析
-        
-        # 3. 使用AST解析表达式（支持变量、比较、逻辑运算）
-        try:
-            # 构建变量查找表（从decisions和condition_state中获取）
-            variables = self._build_variable_lookup(agent_response, condition_state)
-            
-            # 使用AST安全解析和评估
-            return self._safe_eval(condition_expr, variables)
-        except (ValueError, SyntaxError) as e:
-            # AST解析失败，回退到旧逻辑（向后兼容）
-            print(f"Warning: AST evaluation failed for '{condition_expr}': {e}, falling back to legacy evaluation")
-            return self._legacy_evaluate(condition_expr, agent_response, condition_state)
-    
+                if on_error is None:
+                    raise
+                on_error(i, e)
+
+        return -1
+
     def _build_variable_lookup(self, agent_response: Dict[str, Any], condition_state: Dict[str, Any]) -> Dict[str, Any]:
         """
         构建变量查找表
@@ -150,24 +305,10 @@ class UnifiedConditionEvaluator:
         """
         variables = {}
         
-        # 从decisions中获取变量（业务决策，最高优先级）
+        # 从decisions中获取变量（业务决策，最高优先级），转换为Python布尔值或数值
         decisions = agent_response.get("decisions", {})
         for key, value in decisions.items():
-            # 转换为Python布尔值或数值
-            if isinstance(value, bool):
-                variables[key] = value
-            elif isinstance(value, (int, float)):
-                variables[key] = value
-            elif isinstance(value, str):
-                # 字符串转布尔："true"/"True" -> True, "false"/"False" -> False
-                if value.lower() in ("true", "1", "yes"):
-                    variables[key] = True
-                elif value.lower() in ("false", "0", "no"):
-                    variables[key] = False
-                else:
-                    variables[key] = value  # 保留字符串值
-            else:
-                variables[key] = bool(value)  # 其他类型转布尔
+            variables[key] = _decision_value(value)
         
         # 从condition_state中获取变量（细粒度 turn_count 等，decisions优先）
         for key, value in condition_state.items():
@@ -195,37 +336,8 @@ class UnifiedConditionEvaluator:
         # 例如：NOT design_confirmed -> not design_confirmed
         # 但要注意：NOT (A AND B) -> not (A and B)
         
-        # 先替换运算符，使用单词边界确保不会误替换
-        # NOT 作为一元运算符，后面跟空格或括号
-        expr = re.sub(r'\bNOT\b', 'not', expr, flags=re.IGNORECASE)
-        # AND 和 OR 作为二元运算符，前后都有空格或括号
-        expr = re.sub(r'\bAND\b', 'and', expr, flags=re.IGNORECASE)
-        expr = re.sub(r'\bOR\b', 'or', expr, flags=re.IGNORECASE)
-        
-        return expr
-    
-    def _safe_eval(self, expr: str, variables: Dict[str, Any]) -> bool:
-        """
-        安全地计算一个只包含基本字面量和指定运算符的表达式。
-        
-        支持: True, False, 数字, 字符串, (), NOT, AND, OR, ==, !=, <, <=, >, >=
-        
-        Args:
-            expr: 表达式字符串
-            variables: 变量查找表
-            
-        Returns:
-            bool: 表达式结果
-        """
-        try:
-            # 先将表达式转换为 Python 语法
-            python_expr = self._normalize_expression(expr)
-            
-            # 解析表达式为AST
-            tree = ast.parse(python_expr, mode='eval')
-            return self._eval_node(tree.body, variables)
-        except Exception as e:
-            raise ValueError(f"Invalid expression: {expr}") from e
+        # 使用单词边界确保不会误替换，三个关键字在同一次扫描中统一转为小写
+        return _LOGICAL_OP_RE.sub(lambda m: m.group(0).lower(), expr)
     
     def _eval_node(self, node: ast.AST, variables: Dict[str, Any]) -> Any:
         """
@@ -324,44 +436,35 @@ class UnifiedConditionEvaluator:
     def _evaluate_state_expression(self, expr: str, state: Dict[str, Any]) -> bool:
         """评估状态表达式（旧版实现，作为fallback）"""
         try:
-            # 先提取运算符，避免替换复合运算符（>=, <=, !=）中的等号
-            if ">=" in expr or "<=" in expr or "!=" in expr:
-                pass
-            elif "=" in expr and "==" not in expr:
-                expr = expr.replace("=", "==")
-            
-            # 提取变量名和值
-            var_match = re.match(r'(\w+)\s*([><=!]+)\s*(.+)', expr)
-            if var_match:
-                var_name, op, value_str = var_match.groups()
-                var_value = state.get(var_name)
-                if var_value is None:
-                    return False
-                
-                # 转换比较值
-                try:
-                    if "." in value_str or "e" in value_str.lower():
-                        compare_value = float(value_str)
-                    else:
-                        compare_value = int(value_str)
-                except ValueError:
-                    compare_value = value_str.strip('"\'')
-                
-                # 执行比较
-                if op == "==":
-                    return var_value == compare_value
-                elif op == "!=":
-                    return var_value != compare_value
-                elif op == ">":
-                    return var_value > compare_value
-                elif op == ">=":
-                    return var_value >= compare_value
-                elif op == "<":
-                    return var_value < compare_value
-                elif op == "<=":
-                    return var_value <= compare_value
-            
-            return False
+            plan = self._state_expr_plans.get(expr, False)
+            if plan is False:
+                plan = self._state_expr_plans[expr] = self._parse_state_expression(expr)
+            if plan is None:
+                return False
+
+            var_name, op, compare_value = plan
+            var_value = state.get(var_name)
+            if var_value is None:
+                return False
+            return op(var_value, compare_value)
         except Exception as e:
             print(f"Warning: Failed to evaluate expression '{expr}': {e}")
             return False
+
+    def _parse_state_expression(self, expr: str) -> Optional[tuple]:
+        """解析状态表达式为 (变量名, 比较函数, 比较值)，无法识别时返回 None"""
+        var_match = _STATE_EXPR_RE.match(expr)
+        if not var_match:
+            return None
+        var_name, op, value_str = var_match.groups()
+
+        # 转换比较值
+        try:
+            if "." in value_str or "e" in value_str.lower():
+                compare_value = float(value_str)
+            else:
+                compare_value = int(value_str)
+        except ValueError:
+            compare_value = value_str.strip('"\'')
+
+        return var_name, _STATE_EXPR_OPS[op], compare_value
@@ -396,6 +396,100 @@ class TestConditionEvaluator(unittest.TestCase):
         # 如果 AST 解析成功但变量未定义，会抛出异常并被捕获，回退到 legacy 模式
         self.assertFalse(self.evaluator.evaluate("undefined_var == True", agent_response, global_state))
 
+    
+    def test_compile_matches_evaluate(self):
+        """测试预编译条件与 evaluate 结果一致"""
+        cases = [
+            ("", {"decisions": {}}, {}, {}, True),
+            ("true", {"decisions": {}}, {}, {}, True),
+            ("never", {"decisions": {}}, {}, {}, False),
+            ("max_turns_exceeded", {"decisions": {}}, {}, {"total_turns": 10}, True),
+            ("max_turns_exceeded", {"decisions": {}}, {}, {"total_turns": 3}, False),
+            ("error_occurred", {"decisions": {}}, {}, {"error": "boom"}, True),
+            ("design_confirmed", {"decisions": {"design_confirmed": "yes"}}, {}, {}, True),
+            ("NOT design_confirmed AND NOT ready_to_build", {"decisions": {"design_confirmed": True, "ready_to_build": False}}, {}, {}, False),
+            ("(quality_score >= 8 OR review_passed) AND turn_count < 10", {"decisions": {"quality_score": 7, "review_passed": True}}, {"turn_count": 3}, {}, True),
+            ("undefined_var == True", {"decisions": {}}, {}, {}, False),
+            ("turn_count_a_b = 2", {"decisions": {}}, {"turn_count_a_b": 2}, {}, True),
+        ]
+        for condition, agent_response, condition_state, system_state, expected in cases:
+            predicate = self.evaluator.compile(condition)
+            self.assertEqual(predicate(agent_response, condition_state, system_state), expected, condition)
+            self.assertEqual(
+                self.evaluator.evaluate(condition, agent_response, condition_state, system_state),
+                expected,
+                condition
+            )
+        
+        # 同一个预编译函数可以在不同状态下重复使用
+        predicate = self.evaluator.compile("quality_score >= 8")
+        self.assertTrue(predicate({"decisions": {"quality_score": 9}}, {}, {}))
+        self.assertFalse(predicate({"decisions": {"quality_score": 5}}, {}, {}))
+        
+        # 同一条件只编译一次
+        self.assertIs(self.evaluator.compile("quality_score >= 8"), predicate)
+
+    
+    def test_evaluate_all(self):
+        """测试批量评估预编译条件"""
+        predicates = [
+            self.evaluator.compile(condition)
+            for condition in ("ready_to_build", "quality_score >= 8", "max_turns_exceeded")
+        ]
+        agent_response = {"decisions": {"ready_to_build": False, "quality_score": 9}}
+        
+        # 返回第一个满足的条件下标
+        self.assertEqual(self.evaluator.evaluate_all(predicates, agent_response, {}, {"total_turns": 10}), 1)
+        
+        # 都不满足时返回 -1
+        agent_response = {"decisions": {"ready_to_build": False, "quality_score": 5}}
+        self.assertEqual(self.evaluator.evaluate_all(predicates, agent_response, {}, {"total_turns": 1}), -1)
+        
+        # 单个条件出错时通过回调报告并继续评估
+        def failing(agent_response, condition_state=None, system_state=None):
+            raise RuntimeError("boom")
+        errors = []
+        index = self.evaluator.evaluate_all(
+            [failing] + predicates, agent_response, {}, {"total_turns": 10},
+            on_error=lambda i, e: errors.append(i)
+        )
+        self.assertEqual(index, 3)
+        self.assertEqual(errors, [0])
+    
+    def test_bare_identifier_conditions(self):
+        """测试单个变量名条件（快速路径）与完整表达式语义一致"""
+        # decisions 中的值按同样规则转换
+        self.assertTrue(self._evaluate("approved", {"decisions": {"approved": "yes"}}))
+        self.assertFalse(self._evaluate("approved", {"decisions": {"approved": "No"}}))
+        self.assertEqual(self._evaluate("stage", {"decisions": {"stage": "draft"}}), "draft")
+        
+        # decisions 优先于 condition_state
+        self.assertFalse(self._evaluate("approved", {"decisions": {"approved": False}}, {"approved": True}))
+        self.assertTrue(self._evaluate("approved", {"decisions": {}}, {"approved": True}))
+        
+        # 未定义的变量回退到旧逻辑
+        self.assertFalse(self._evaluate("approved"))
+        
+        # 规范化后是运算符/字面量的名字不走变量查找
+        self.assertTrue(self._evaluate("True"))
+        
+        # evaluate_all 中复用共享的变量查找表
+        predicates = [self.evaluator.compile("approved"), self.evaluator.compile("done")]
+        self.assertEqual(self.evaluator.evaluate_all(predicates, {"decisions": {"done": "true"}}, {}, {}), 1)
+
+    def test_legacy_state_expressions(self):
+        """测试旧版状态表达式（fallback）的比较运算"""
+        state = {"turn_count": 5, "stage": "draft"}
+        self.assertTrue(self.evaluator._evaluate_state_expression("turn_count >= 5", state))
+        self.assertFalse(self.evaluator._evaluate_state_expression("turn_count <= 4", state))
+        self.assertTrue(self.evaluator._evaluate_state_expression("turn_count = 5", state))
+        self.assertFalse(self.evaluator._evaluate_state_expression("turn_count != 5", state))
+        self.assertTrue(self.evaluator._evaluate_state_expression("stage == 'draft'", state))
+
+        # 未定义的变量和无法识别的表达式都为 False
+        self.assertFalse(self.evaluator._evaluate_state_expression("missing > 1", state))
+        self.assertFalse(self.evaluator._evaluate_state_expression("turn_count => 1", state))
+
 
 if __name__ == "__main__":
     unittest.main()